@@ -13,23 +13,47 @@ os.environ['SDL_AUDIODRIVER'] = 'dummy'
 import pygame
 import time
 import random
+import numpy as np
 from typing import List, Tuple
 from sprites import Bullet, Enemy
 from config import SCREEN_WIDTH, SCREEN_HEIGHT
-from optimized_collision import optimized_groupcollide, optimized_spritecollide, SpatialHash
+from optimized_collision import optimized_groupcollide, optimized_spritecollide, SpatialHash, Quadtree, SpriteSoA
+from collision_kernels import (aabb_pairs_swar, make_aabb_pairs_swar, rect_cells, warmup as warmup_kernels,
+                               warmup_benchmark as warmup_benchmark_kernels, NUMBA_AVAILABLE)
 
 class CollisionBenchmark:
     """碰撞检测性能基准测试类"""
     
+    # 测试不同规模的数据
+    TEST_CASES = [
+        (20, 15),   # 小规模
+        (50, 30),   # 中等规模
+        (100, 60),  # 大规模
+    ]
+    
     def __init__(self):
         """初始化测试环境"""
+        # 基准测试不做任何绘制，无需创建显示窗口
         pygame.init()
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("碰撞检测性能测试")
         
         # 测试数据
         self.test_results = {}
         
+        # 预编译碰撞内核，避免把JIT冷启动时间计入测试结果；
+        # 内核使用cache=True，编译结果会缓存到磁盘，后续运行只需加载
+        start_ns = time.perf_counter_ns()
+        warmup_kernels()
+        warmup_benchmark_kernels()
+        # 为各测试规模生成并编译固定尺寸的特化内核
+        self._specialized_kernels = {
+            (n, m): make_aabb_pairs_swar(n, m) for n, m in self.TEST_CASES
+        }
+        warmup_ms = (time.perf_counter_ns() - start_ns) / 1e6
+        if NUMBA_AVAILABLE:
+            print(f"JIT预热完成，耗时 {warmup_ms:.1f} ms")
+        else:
+            print("未安装Numba，使用NumPy实现，跳过JIT预热")
+        
     def create_test_sprites(self, num_bullets=50, num_enemies=30):
         """创建测试用的精灵对象"""
         # 创建精灵组
@@ -48,164 +72,226 @@ class CollisionBenchmark:
             enemy = Enemy()
             enemy.rect.x = random.randint(0, SCREEN_WIDTH - enemy.rect.width)
             enemy.rect.y = random.randint(0, SCREEN_HEIGHT - enemy.rect.height)
+            enemy.sync_slot()
             enemies.add(enemy)
         
+        # 生成精灵后一次性构建SoA边界框数组，供各碰撞算法复用
+        bullets.soa = SpriteSoA(bullets)
+        enemies.soa = SpriteSoA(enemies)
+        
         return bullets, enemies
     
-    def benchmark_basic_collision(self, bullets, enemies, iterations=1000):
-        """测试基础碰撞检测性能（当前实现）"""
-        print(f"测试基础碰撞检测，迭代次数: {iterations}")
+    def _optimized_groupcollide(self, group1, group2, count_only=False):
+        """优化的组碰撞检测算法
+
+        读取两组精灵预先构建的SoA边界框数组，以SWAR格式（每个uint64
+        打包一个矩形的4个16位坐标）交给 collision_kernels.aabb_pairs_swar
+        计算重叠索引对，把N*M次Python级比较下放到编译后的本地循环
+        （或NumPy向量化回退实现）中执行，每对矩形只需一次64位减法。
+
+        Args:
+            group1: 第一个精灵组
+            group2: 第二个精灵组
+            count_only: 为True时只返回发生碰撞的group1精灵数量，不构建结果字典
+
+        Returns:
+            碰撞结果字典，count_only为True时返回整数
+        """
+        soa1 = self._soa_of(group1)
+        soa2 = self._soa_of(group2)
+        if not len(soa1) or not len(soa2):
+            return 0 if count_only else {}
+        
+        # 复用预先构建的SWAR打包边界框（每个uint64存放一个矩形）
+        sprites1 = soa1.sprites
+        sprites2 = soa2.sprites
+        
+        # 由编译后的SWAR内核计算重叠索引对，已注册的尺寸使用特化内核
+        kernel = self._specialized_kernels.get((len(soa1), len(soa2)), aabb_pairs_swar)
+        i_idx, j_idx = kernel(soa1.packed, soa2.packed)
+        
+        if count_only:
+            return self._count_hit_rows(i_idx)
+        return self._hits_from_pairs(sprites1, sprites2, i_idx, j_idx)
+    
+    def _collidelist_groupcollide(self, group1, group2):
+        """基于Rect.collidelistall的组碰撞检测算法
+
+        每个group1精灵只调用一次 collidelistall，由pygame的C实现完成
+        与整个group2矩形列表的比较，不依赖NumPy或Numba，
+        作为编译内核方案的对照基线。
+        """
+        hits = {}
         
-        start_time = time.perf_counter()
-        collision_count = 0
+        sprites2 = group2.sprites()
+        rects2 = [s.rect for s in sprites2]
         
-        for _ in range(iterations):
-            # 使用当前的碰撞检测方法
-            hits = pygame.sprite.groupcollide(bullets, enemies, False, False)
-            collision_count += len(hits)
-        
-        end_time = time.perf_counter()
-        total_time = end_time - start_time
-        
-        result = {
-            'method': '基础groupcollide',
-            'total_time': total_time,
-            'avg_time_per_iteration': total_time / iterations,
-            'collisions_found': collision_count,
-            'bullets_count': len(bullets),
-            'enemies_count': len(enemies)
-        }
-        
-        print(f"总时间: {total_time:.4f}秒")
-        print(f"平均每次迭代: {result['avg_time_per_iteration']:.6f}秒")
-        print(f"发现碰撞: {collision_count}次")
+        for sprite1 in group1.sprites():
+            idxs = sprite1.rect.collidelistall(rects2)
+            if idxs:
+                hits[sprite1] = [sprites2[i] for i in idxs]
         
-        return result
+        return hits
     
-    def benchmark_optimized_collision(self, bullets, enemies, iterations=1000):
-        """测试优化后的碰撞检测性能"""
-        print(f"测试优化碰撞检测，迭代次数: {iterations}")
-        
-        start_time = time.perf_counter()
-        collision_count = 0
-        
-        for _ in range(iterations):
-            # 使用优化的碰撞检测方法
-            hits = self._optimized_groupcollide(bullets, enemies)
-            collision_count += len(hits)
-        
-        end_time = time.perf_counter()
-        total_time = end_time - start_time
-        
-        result = {
-            'method': '优化groupcollide',
-            'total_time': total_time,
-            'avg_time_per_iteration': total_time / iterations,
-            'collisions_found': collision_count,
-            'bullets_count': len(bullets),
-            'enemies_count': len(enemies)
-        }
+    def _spatial_hash_collision(self, group1, group2, cell_size, count_only=False):
+        """空间哈希碰撞检测算法
+
+        使用紧凑哈希（compact hashing）布局代替每次重建的Python字典：
+        group2覆盖的 (精灵索引, 单元ID) 展开为扁平数组后按单元ID排序，
+        再用 cell_start 偏移数组记录每个单元在排序结果中的起始位置，
+        查询完全通过数组索引完成。
+        count_only为True时只返回发生碰撞的group1精灵数量。
+        """
+        soa1 = self._soa_of(group1)
+        soa2 = self._soa_of(group2)
+        if not len(soa1) or not len(soa2):
+            return 0 if count_only else {}
+        
+        sprites1, b = soa1.sprites, soa1.rects
+        sprites2, e = soa2.sprites, soa2.rects
+        
+        # 构建哈希表：按单元ID排序的精灵索引 + 每个单元的起止偏移
+        e_idx, e_cells = rect_cells(e, cell_size)
+        order = np.argsort(e_cells, kind='stable')
+        sorted_cells = e_cells[order]
+        sorted_idx = e_idx[order]
+        unique_cells = np.unique(sorted_cells)
+        cell_start = np.searchsorted(sorted_cells, unique_cells)
+        cell_end = np.append(cell_start[1:], len(sorted_cells))
+        
+        # 查询group1覆盖的单元
+        b_idx, b_cells = rect_cells(b, cell_size)
+        pos = np.minimum(np.searchsorted(unique_cells, b_cells), len(unique_cells) - 1)
+        found = unique_cells[pos] == b_cells
+        pos = pos[found]
+        starts = cell_start[pos]
+        counts = cell_end[pos] - starts
+        
+        # 展开候选对
+        cand_i = np.repeat(b_idx[found], counts)
+        local = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+        cand_j = sorted_idx[np.repeat(starts, counts) + local]
+        
+        # 去重（同一对精灵可能共享多个单元）
+        m = len(sprites2)
+        keys = np.unique(cand_i.astype(np.int64) * m + cand_j)
+        ci = keys // m
+        cj = keys % m
+        
+        # 精确检测，与Rect.colliderect的严格比较一致
+        ok = ((b[ci, 0] < e[cj, 2]) & (b[ci, 2] > e[cj, 0]) &
+              (b[ci, 1] < e[cj, 3]) & (b[ci, 3] > e[cj, 1]))
+        
+        if count_only:
+            return self._count_hit_rows(ci[ok])
+        return self._hits_from_pairs(sprites1, sprites2, ci[ok], cj[ok])
+    
+    def _quadtree_collision(self, group1, group2, tree):
+        """四叉树碰撞检测算法（每次迭代重建树）"""
+        # 只取一次精灵列表，避免反复构造Group迭代器
+        sprites1 = group1.sprites()
+        sprites2 = group2.sprites()
         
-        print(f"总时间: {total_time:.4f}秒")
-        print(f"平均每次迭代: {result['avg_time_per_iteration']:.6f}秒")
-        print(f"发现碰撞: {collision_count}次")
+        tree.clear()
+        insert = tree.insert
+        for j in range(len(sprites2)):
+            insert(sprites2[j])
         
-        return result
-    
-    def _optimized_groupcollide(self, group1, group2):
-        """优化的组碰撞检测算法"""
         hits = {}
-        
-        # 预先计算边界框，减少重复计算
-        group1_rects = [(sprite, sprite.rect) for sprite in group1]
-        group2_rects = [(sprite, sprite.rect) for sprite in group2]
-        
-        # 使用空间分割优化
-        for sprite1, rect1 in group1_rects:
-            for sprite2, rect2 in group2_rects:
-                # 快速边界框检测
-                if (rect1.right >= rect2.left and rect1.left <= rect2.right and
-                    rect1.bottom >= rect2.top and rect1.top <= rect2.bottom):
-                    
-                    if sprite1 not in hits:
-                        hits[sprite1] = []
-                    hits[sprite1].append(sprite2)
+        retrieve = tree.retrieve
+        for i in range(len(sprites1)):
+            sprite1 = sprites1[i]
+            rect1 = sprite1.rect
+            for sprite2 in retrieve(rect1):
+                if rect1.colliderect(sprite2.rect):
+                    hits.setdefault(sprite1, []).append(sprite2)
         
         return hits
     
-    def benchmark_spatial_hash_collision(self, bullets, enemies, iterations=1000):
-        """测试空间哈希碰撞检测性能"""
-        print(f"测试空间哈希碰撞检测，迭代次数: {iterations}")
-        
-        start_time = time.perf_counter()
-        collision_count = 0
-        
-        # 创建空间哈希表
-        cell_size = 64  # 网格大小
-        
-        for _ in range(iterations):
-            hits = self._spatial_hash_collision(bullets, enemies, cell_size)
-            collision_count += len(hits)
-        
-        end_time = time.perf_counter()
-        total_time = end_time - start_time
-        
-        result = {
-            'method': '空间哈希',
-            'total_time': total_time,
-            'avg_time_per_iteration': total_time / iterations,
-            'collisions_found': collision_count,
-            'bullets_count': len(bullets),
-            'enemies_count': len(enemies)
-        }
-        
-        print(f"总时间: {total_time:.4f}秒")
-        print(f"平均每次迭代: {result['avg_time_per_iteration']:.6f}秒")
-        print(f"发现碰撞: {collision_count}次")
-        
-        return result
+    @staticmethod
+    def _count_hit_rows(i_idx):
+        """统计按行排序的索引对中出现的不同行数，即发生碰撞的group1精灵数量"""
+        if not len(i_idx):
+            return 0
+        return int(np.count_nonzero(np.diff(i_idx))) + 1
     
-    def _spatial_hash_collision(self, group1, group2, cell_size):
-        """空间哈希碰撞检测算法"""
-        # 创建空间哈希表
-        spatial_hash = {}
-        
-        # 将group2的精灵放入哈希表
-        for sprite in group2:
-            cells = self._get_cells(sprite.rect, cell_size)
-            for cell in cells:
-                if cell not in spatial_hash:
-                    spatial_hash[cell] = []
-                spatial_hash[cell].append(sprite)
-        
-        # 检测group1与哈希表中精灵的碰撞
-        hits = {}
-        for sprite1 in group1:
-            cells = self._get_cells(sprite1.rect, cell_size)
-            for cell in cells:
-                if cell in spatial_hash:
-                    for sprite2 in spatial_hash[cell]:
-                        if sprite1.rect.colliderect(sprite2.rect):
-                            if sprite1 not in hits:
-                                hits[sprite1] = []
-                            if sprite2 not in hits[sprite1]:
-                                hits[sprite1].append(sprite2)
+    @staticmethod
+    def _hits_from_pairs(sprites1, sprites2, i_idx, j_idx):
+        """由按行排序的索引对构建碰撞结果字典
         
+        只遍历有命中的行：先找出行号变化的位置把索引对切分为连续的段，
+        每段一次性生成该行的命中列表，不再逐对调用setdefault。
+        """
+        hits = {}
+        if not len(i_idx):
+            return hits
+        i_list = i_idx.tolist()
+        j_list = j_idx.tolist()
+        starts = [0] + (np.flatnonzero(np.diff(i_idx)) + 1).tolist()
+        ends = starts[1:] + [len(i_list)]
+        for start, end in zip(starts, ends):
+            hits[sprites1[i_list[start]]] = [sprites2[j] for j in j_list[start:end]]
         return hits
     
-    def _get_cells(self, rect, cell_size):
-        """获取矩形覆盖的网格单元"""
-        cells = []
-        start_x = rect.left // cell_size
-        end_x = rect.right // cell_size
-        start_y = rect.top // cell_size
-        end_y = rect.bottom // cell_size
-        
-        for x in range(start_x, end_x + 1):
-            for y in range(start_y, end_y + 1):
-                cells.append((x, y))
-        
-        return cells
+    @staticmethod
+    def _soa_of(group):
+        """获取精灵组的SoA视图，没有预先构建时临时创建"""
+        soa = getattr(group, 'soa', None)
+        return soa if soa is not None else SpriteSoA(group.sprites())
+    
+    def _run_methods_on(self, bullets, enemies, iterations=1000, cell_size=64):
+        """在同一个迭代循环中轮流运行所有碰撞检测方法
+        
+        SoA边界框数组和四叉树只构建一次，由各方法共享；每种方法的耗时
+        使用 time.perf_counter_ns 的整数纳秒分别累加。
+        
+        Returns:
+            按 基础、collidelistall、优化、空间哈希、四叉树 顺序排列的结果字典列表
+        """
+        print(f"轮流测试所有碰撞检测方法，迭代次数: {iterations}")
+        
+        # 共享的预计算：SoA数组与四叉树
+        for group in (bullets, enemies):
+            if getattr(group, 'soa', None) is None:
+                group.soa = SpriteSoA(group.sprites())
+        tree = Quadtree()
+        
+        # 每种方法返回发生碰撞的子弹数量；能只计数的方法跳过结果字典的构建
+        methods = [
+            ('基础groupcollide', lambda: len(pygame.sprite.groupcollide(bullets, enemies, False, False))),
+            ('collidelistall', lambda: len(self._collidelist_groupcollide(bullets, enemies))),
+            ('优化groupcollide', lambda: self._optimized_groupcollide(bullets, enemies, count_only=True)),
+            ('空间哈希', lambda: self._spatial_hash_collision(bullets, enemies, cell_size, count_only=True)),
+            ('四叉树', lambda: len(self._quadtree_collision(bullets, enemies, tree))),
+        ]
+        elapsed_ns = [0] * len(methods)
+        collision_counts = [0] * len(methods)
+        perf_counter_ns = time.perf_counter_ns
+        
+        for _ in range(iterations):
+            for k, (_, run) in enumerate(methods):
+                start_ns = perf_counter_ns()
+                count = run()
+                elapsed_ns[k] += perf_counter_ns() - start_ns
+                collision_counts[k] += count
+        
+        results = []
+        for (method, _), total_ns, collision_count in zip(methods, elapsed_ns, collision_counts):
+            total_time = total_ns / 1e9
+            result = {
+                'method': method,
+                'total_time': total_time,
+                'total_time_ns': total_ns,
+                'avg_time_per_iteration': total_time / iterations,
+                'collisions_found': collision_count,
+                'bullets_count': len(bullets),
+                'enemies_count': len(enemies)
+            }
+            print(f"{method}: 总时间 {total_time:.4f}秒, "
+                  f"平均每次迭代 {result['avg_time_per_iteration']:.6f}秒, 发现碰撞 {collision_count}次")
+            results.append(result)
+        
+        return results
     
     def run_full_benchmark(self):
         """运行完整的性能基准测试"""
@@ -213,45 +299,41 @@ class CollisionBenchmark:
         print("碰撞检测性能基准测试")
         print("=" * 60)
         
-        # 测试不同规模的数据
-        test_cases = [
-            (20, 15),   # 小规模
-            (50, 30),   # 中等规模
-            (100, 60),  # 大规模
-        ]
-        
-        for bullets_count, enemies_count in test_cases:
+        for bullets_count, enemies_count in self.TEST_CASES:
             print(f"\n测试规模: {bullets_count}个子弹, {enemies_count}个敌机")
             print("-" * 50)
             
             bullets, enemies = self.create_test_sprites(bullets_count, enemies_count)
             
-            # 测试基础方法
-            basic_result = self.benchmark_basic_collision(bullets, enemies, 500)
-            
-            # 测试优化方法
-            optimized_result = self.benchmark_optimized_collision(bullets, enemies, 500)
-            
-            # 测试空间哈希方法
-            spatial_result = self.benchmark_spatial_hash_collision(bullets, enemies, 500)
+            # 在同一个迭代循环中轮流测试所有方法
+            basic_result, collidelist_result, optimized_result, spatial_result, quadtree_result = \
+                self._run_methods_on(bullets, enemies, 500)
             
             # 计算性能提升
             basic_time = basic_result['avg_time_per_iteration']
+            collidelist_improvement = (basic_time - collidelist_result['avg_time_per_iteration']) / basic_time * 100
             optimized_improvement = (basic_time - optimized_result['avg_time_per_iteration']) / basic_time * 100
             spatial_improvement = (basic_time - spatial_result['avg_time_per_iteration']) / basic_time * 100
+            quadtree_improvement = (basic_time - quadtree_result['avg_time_per_iteration']) / basic_time * 100
             
             print(f"\n性能对比:")
+            print(f"collidelistall提升: {collidelist_improvement:.1f}%")
             print(f"优化方法提升: {optimized_improvement:.1f}%")
             print(f"空间哈希提升: {spatial_improvement:.1f}%")
+            print(f"四叉树提升: {quadtree_improvement:.1f}%")
             
             # 保存结果
             test_key = f"{bullets_count}_{enemies_count}"
             self.test_results[test_key] = {
                 'basic': basic_result,
+                'collidelist': collidelist_result,
                 'optimized': optimized_result,
                 'spatial_hash': spatial_result,
+                'quadtree': quadtree_result,
+                'collidelist_improvement': collidelist_improvement,
                 'optimized_improvement': optimized_improvement,
-                'spatial_improvement': spatial_improvement
+                'spatial_improvement': spatial_improvement,
+                'quadtree_improvement': quadtree_improvement
             }
         
         print("\n=" * 60)
@@ -269,19 +351,27 @@ def main():
     print("\n总结报告:")
     print("=" * 40)
     
+    total_collidelist_improvement = 0
     total_optimized_improvement = 0
     total_spatial_improvement = 0
+    total_quadtree_improvement = 0
     test_count = len(results)
     
     for test_key, result in results.items():
+        total_collidelist_improvement += result['collidelist_improvement']
         total_optimized_improvement += result['optimized_improvement']
         total_spatial_improvement += result['spatial_improvement']
+        total_quadtree_improvement += result['quadtree_improvement']
     
+    avg_collidelist_improvement = total_collidelist_improvement / test_count
     avg_optimized_improvement = total_optimized_improvement / test_count
     avg_spatial_improvement = total_spatial_improvement / test_count
+    avg_quadtree_improvement = total_quadtree_improvement / test_count
     
+    print(f"平均collidelistall性能提升: {avg_collidelist_improvement:.1f}%")
     print(f"平均优化方法性能提升: {avg_optimized_improvement:.1f}%")
     print(f"平均空间哈希性能提升: {avg_spatial_improvement:.1f}%")
+    print(f"平均四叉树性能提升: {avg_quadtree_improvement:.1f}%")
     
     pygame.quit()
 
@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+碰撞检测计算内核
+使用Numba将AABB重叠测试这类紧凑的整数比较循环编译为本地代码，
+未安装Numba时自动回退到NumPy向量化实现
+"""
+
+import numpy as np
+from functools import lru_cache
+
+try:
+    from numba import njit, prange, typeof as numba_typeof
+    NUMBA_AVAILABLE = True
+except ImportError:  # Numba为可选依赖
+    NUMBA_AVAILABLE = False
+    prange = range
+
+
+def _collide_frame_numpy(positions, bullet_slots, enemy_slots, px0, py0, px1, py1, has_player):
+    """NumPy版本的逐帧碰撞检测（Numba不可用时的回退实现）"""
+    b = positions[bullet_slots]
+    e = positions[enemy_slots]
+    mask = ((b[:, 0:1] < e[:, 2]) & (b[:, 2:3] > e[:, 0]) &
+            (b[:, 1:2] < e[:, 3]) & (b[:, 3:4] > e[:, 1]))
+    i_idx = mask.any(axis=1).nonzero()[0]
+    j_idx = mask[i_idx].argmax(axis=1)
+    if has_player:
+        p_idx = ((px0 < e[:, 2]) & (px1 > e[:, 0]) & (py0 < e[:, 3]) & (py1 > e[:, 1])).nonzero()[0]
+    else:
+        p_idx = np.empty(0, np.int64)
+    return i_idx.astype(np.int64), j_idx.astype(np.int64), p_idx.astype(np.int64)
+
+
+def _collide_frame_loop(positions, bullet_slots, enemy_slots, px0, py0, px1, py1, has_player):
+    """逐帧的子弹-敌机与玩家-敌机碰撞检测
+
+    直接按槽位读取实体位置池的边界框，省去在Python侧收集、拼接数组的开销；
+    游戏中每帧只有几十个精灵，使用串行循环避免并行启动线程的固定开销。
+    边界采用开区间比较，与Rect.colliderect一致。子弹只能击中一个敌机，
+    因此每颗子弹只报告第一个相交的敌机，找到后立即结束内层循环。
+
+    Args:
+        positions: 实体位置池的(N, 4) int32边界框数组
+        bullet_slots: 子弹槽位数组
+        enemy_slots: 敌机槽位数组
+        px0, py0, px1, py1: 玩家边界框
+        has_player: 是否检测玩家碰撞
+
+    Returns:
+        (bullet_idx, enemy_idx, player_enemy_idx)，均为在槽位数组中的下标，
+        bullet_idx 按升序排列且不重复
+    """
+    nb = bullet_slots.shape[0]
+    ne = enemy_slots.shape[0]
+    
+    # 先把敌机边界框收集为连续数组，内层循环顺序访问
+    e = np.empty((ne, 4), np.int32)
+    for j in range(ne):
+        t = enemy_slots[j]
+        for k in range(4):
+            e[j, k] = positions[t, k]
+    
+    i_buf = np.empty(nb, np.int64)
+    j_buf = np.empty(nb, np.int64)
+    n = 0
+    for i in range(nb):
+        s = bullet_slots[i]
+        bx0 = positions[s, 0]
+        by0 = positions[s, 1]
+        bx1 = positions[s, 2]
+        by1 = positions[s, 3]
+        for j in range(ne):
+            if bx0 < e[j, 2] and bx1 > e[j, 0] and by0 < e[j, 3] and by1 > e[j, 1]:
+                i_buf[n] = i
+                j_buf[n] = j
+                n += 1
+                break
+    
+    p_buf = np.empty(ne if has_player else 0, np.int64)
+    c = 0
+    if has_player:
+        for j in range(ne):
+            if px0 < e[j, 2] and px1 > e[j, 0] and py0 < e[j, 3] and py1 > e[j, 1]:
+                p_buf[c] = j
+                c += 1
+    return i_buf[:n].copy(), j_buf[:n].copy(), p_buf[:c].copy()
+
+
+# SWAR打包参数：坐标加上偏置后放入16位通道，要求坐标位于 [-16384, 16383]，
+# 这样每个通道的最高位在打包后恒为0，可用作借位检测位
+SWAR_BIAS = 16384
+SWAR_HIGH_BITS = np.uint64(0x8000800080008000)
+SWAR_LOW_HALF = np.uint64(0x00000000FFFFFFFF)
+SWAR_HIGH_HALF = np.uint64(0xFFFFFFFF00000000)
+SWAR_SHIFT = np.uint64(32)
+
+
+def pack_swar(rects: np.ndarray) -> np.ndarray:
+    """把边界框打包为SWAR格式的uint64数组
+
+    每个矩形的 (x0, y0, x1 - 1, y1 - 1) 加上 SWAR_BIAS 后按小端序存入4个16位通道，
+    即低32位为 (x0, y0)，高32位为 (x1 - 1, y1 - 1)。右下角改为包含在矩形内的
+    最后一个像素，内核的闭区间比较就与Rect.colliderect的半开区间结果一致，
+    只接触边缘的矩形不算重叠。
+
+    Args:
+        rects: 形状为(N, 4)的整数数组，每行为 (x0, y0, x1, y1)，x1、y1不包含在矩形内
+
+    Returns:
+        形状为(N,)的uint64数组
+    """
+    lanes = rects.astype(np.int32) + SWAR_BIAS
+    lanes[:, 2:] -= 1
+    lanes = lanes.astype('<u2')
+    return np.ascontiguousarray(lanes).view('<u8').ravel()
+
+
+def _aabb_pairs_swar_numpy(bp: np.ndarray, ep: np.ndarray):
+    """NumPy广播版本的SWAR AABB成对检测（Numba不可用时的回退实现）"""
+    a = (bp >> SWAR_SHIFT)[:, None] | (ep & SWAR_HIGH_HALF)[None, :]
+    b = (ep & SWAR_LOW_HALF)[None, :] | ((bp & SWAR_LOW_HALF) << SWAR_SHIFT)[:, None]
+    mask = (((a | SWAR_HIGH_BITS) - b) & SWAR_HIGH_BITS) == SWAR_HIGH_BITS
+    i_idx, j_idx = mask.nonzero()
+    return i_idx.astype(np.int64), j_idx.astype(np.int64)
+
+
+def _aabb_pairs_swar_loop(bp, ep):
+    """SWAR版本的AABB成对检测
+
+    把4次比较合并为一次64位减法：构造
+        A = (b.x1, b.y1, e.x1, e.y1)
+        B = (e.x0, e.y0, b.x0, b.y0)
+    两矩形重叠当且仅当每个通道都满足 A >= B。先给A的每个通道置最高位，
+    相减后某通道最高位仍为1即表示该通道没有借位（A >= B）。
+    边界采用闭区间比较，pack_swar 已把右下角换成矩形内的最后一个像素。
+    """
+    n = bp.shape[0]
+    m = ep.shape[0]
+    counts = np.zeros(n, np.int64)
+    buf = np.empty((n, m), np.int32)
+    for i in prange(n):
+        b_hi = bp[i] >> SWAR_SHIFT
+        b_lo = (bp[i] & SWAR_LOW_HALF) << SWAR_SHIFT
+        c = 0
+        for j in range(m):
+            a = b_hi | (ep[j] & SWAR_HIGH_HALF)
+            b = (ep[j] & SWAR_LOW_HALF) | b_lo
+            if (((a | SWAR_HIGH_BITS) - b) & SWAR_HIGH_BITS) == SWAR_HIGH_BITS:
+                buf[i, c] = j
+                c += 1
+        counts[i] = c
+
+    return _compact_rows(counts, buf)
+
+
+def _compact_rows(counts, buf):
+    """按前缀和把逐行的命中结果串行压缩为扁平的 (i_idx, j_idx) 数组"""
+    n = counts.shape[0]
+    total = 0
+    for i in range(n):
+        total += counts[i]
+    out_i = np.empty(total, np.int64)
+    out_j = np.empty(total, np.int64)
+    k = 0
+    for i in range(n):
+        for c in range(counts[i]):
+            out_i[k] = i
+            out_j[k] = buf[i, c]
+            k += 1
+    return out_i, out_j
+
+
+# 空间哈希使用的质数与哈希表大小（prime-XOR 紧凑哈希）
+HASH_P1 = 73856093
+HASH_P2 = 19349663
+HASH_TABLE_SIZE = 1 << 20
+
+
+def _rect_cells_numpy(rects: np.ndarray, cell_size: int):
+    """NumPy版本的网格单元展开（Numba不可用时的回退实现）
+
+    Args:
+        rects: 形状为(N, 4)的int32数组，每行为 (x0, y0, x1, y1)
+        cell_size: 网格单元大小
+
+    Returns:
+        (sprite_idx, cell_id) 两个扁平数组，每个元素表示一个精灵覆盖的一个网格单元
+    """
+    r = rects.astype(np.int64)
+    cx0 = r[:, 0] // cell_size
+    cy0 = r[:, 1] // cell_size
+    w = r[:, 2] // cell_size - cx0 + 1
+    h = r[:, 3] // cell_size - cy0 + 1
+    counts = w * h
+    total = int(counts.sum())
+    sprite_idx = np.repeat(np.arange(r.shape[0], dtype=np.int32), counts)
+    local = np.arange(total, dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+    cx = np.repeat(cx0, counts) + local // np.repeat(h, counts)
+    cy = np.repeat(cy0, counts) + local % np.repeat(h, counts)
+    cell_id = ((HASH_P1 * cx) ^ (HASH_P2 * cy)) % HASH_TABLE_SIZE
+    return sprite_idx, cell_id
+
+
+def _rect_cells_loop(rects, cell_size):
+    """显式循环版本的网格单元展开，直接输出扁平的 (sprite_idx, cell_id) 数组"""
+    n = rects.shape[0]
+    total = 0
+    for i in range(n):
+        w = rects[i, 2] // cell_size - rects[i, 0] // cell_size + 1
+        h = rects[i, 3] // cell_size - rects[i, 1] // cell_size + 1
+        total += w * h
+    sprite_idx = np.empty(total, np.int32)
+    cell_id = np.empty(total, np.int64)
+    k = 0
+    for i in range(n):
+        for cx in range(rects[i, 0] // cell_size, rects[i, 2] // cell_size + 1):
+            for cy in range(rects[i, 1] // cell_size, rects[i, 3] // cell_size + 1):
+                sprite_idx[k] = i
+                cell_id[k] = ((HASH_P1 * np.int64(cx)) ^ (HASH_P2 * np.int64(cy))) % HASH_TABLE_SIZE
+                k += 1
+    return sprite_idx, cell_id
+
+
+def _rect_cells_packed_numpy(rects: np.ndarray, cell_size: int):
+    """NumPy版本的打包网格单元展开（Numba不可用时的回退实现）
+
+    Args:
+        rects: 形状为(N, 4)的int32数组，每行为 (x0, y0, x1, y1)
+        cell_size: 网格单元大小
+
+    Returns:
+        (sprite_idx, cell) 两个扁平数组，cell 打包为 (cx << 16) | (cy & 0xFFFF)
+    """
+    r = rects.astype(np.int64)
+    cx0 = r[:, 0] // cell_size
+    cy0 = r[:, 1] // cell_size
+    w = np.maximum(r[:, 2] // cell_size - cx0 + 1, 0)
+    h = np.maximum(r[:, 3] // cell_size - cy0 + 1, 0)
+    counts = w * h
+    total = int(counts.sum())
+    sprite_idx = np.repeat(np.arange(r.shape[0], dtype=np.int32), counts)
+    local = np.arange(total, dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+    hh = np.repeat(h, counts)
+    cx = np.repeat(cx0, counts) + local // hh
+    cy = np.repeat(cy0, counts) + local % hh
+    return sprite_idx, ((cx << 16) | (cy & 0xFFFF)).astype(np.int32)
+
+
+def _rect_cells_packed_loop(rects, cell_size):
+    """显式循环版本的打包网格单元展开，先计数再写入预分配的扁平数组"""
+    n = rects.shape[0]
+    total = 0
+    for i in range(n):
+        w = rects[i, 2] // cell_size - rects[i, 0] // cell_size + 1
+        h = rects[i, 3] // cell_size - rects[i, 1] // cell_size + 1
+        if w > 0 and h > 0:
+            total += w * h
+    sprite_idx = np.empty(total, np.int32)
+    cell = np.empty(total, np.int32)
+    k = 0
+    for i in range(n):
+        for cx in range(rects[i, 0] // cell_size, rects[i, 2] // cell_size + 1):
+            for cy in range(rects[i, 1] // cell_size, rects[i, 3] // cell_size + 1):
+                sprite_idx[k] = i
+                cell[k] = (cx << 16) | (cy & 0xFFFF)
+                k += 1
+    return sprite_idx, cell
+
+
+def _hash_pairs_numpy(b1: np.ndarray, b2: np.ndarray, cell_size: int,
+                      cells: np.ndarray, starts: np.ndarray, ends: np.ndarray, items: np.ndarray):
+    """NumPy版本的空间哈希批量查询（Numba不可用时的回退实现）
+
+    Args:
+        b1: 查询矩形，形状为(N, 4)的int32数组，每行为 (x0, y0, x1, y1)
+        b2: 哈希表中精灵的边界框，形状为(M, 4)的int32数组
+        cell_size: 网格单元大小
+        cells: 升序排列的非空网格单元（与 rect_cells_packed 的打包方式相同）
+        starts, ends: 每个网格单元在 items 中的起止偏移
+        items: 按网格单元排序的精灵下标
+
+    Returns:
+        (i_idx, j_idx) 两个int64数组，按i升序列出相交的 (b1下标, b2下标)
+    """
+    empty = np.empty(0, np.int64)
+    if not len(cells) or not len(b1):
+        return empty, empty
+    q_idx, q_cells = _rect_cells_packed_numpy(b1, cell_size)
+    pos = np.minimum(np.searchsorted(cells, q_cells), len(cells) - 1)
+    found = cells[pos] == q_cells
+    pos = pos[found]
+    counts = ends[pos] - starts[pos]
+    cand_i = np.repeat(q_idx[found].astype(np.int64), counts)
+    local = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+    cand_j = items[np.repeat(starts[pos], counts) + local].astype(np.int64)
+    # 同一对精灵可能共享多个网格，按组合键去重（np.unique同时保证按i升序）
+    key = np.unique(cand_i * len(b2) + cand_j)
+    cand_i, cand_j = key // len(b2), key % len(b2)
+    r1, r2 = b1[cand_i], b2[cand_j]
+    mask = ((r1[:, 0] < r2[:, 2]) & (r1[:, 2] > r2[:, 0]) &
+            (r1[:, 1] < r2[:, 3]) & (r1[:, 3] > r2[:, 1]))
+    return cand_i[mask], cand_j[mask]
+
+
+def _hash_pairs_loop(b1, b2, cell_size, cells, starts, ends, items):
+    """显式循环版本的空间哈希批量查询
+
+    逐个查询矩形展开其覆盖的网格，在升序的网格数组上二分查找，
+    用以查询下标为标记的 seen 数组去重后直接做AABB比较，输出数组按需倍增。
+    """
+    n1 = b1.shape[0]
+    n_cells = cells.shape[0]
+    seen = np.full(b2.shape[0], -1, np.int64)
+    cap = max(16, n1)
+    out_i = np.empty(cap, np.int64)
+    out_j = np.empty(cap, np.int64)
+    k = 0
+    for i in range(n1):
+        x0, y0, x1, y1 = b1[i, 0], b1[i, 1], b1[i, 2], b1[i, 3]
+        for cx in range(x0 // cell_size, x1 // cell_size + 1):
+            for cy in range(y0 // cell_size, y1 // cell_size + 1):
+                cell = (cx << 16) | (cy & 0xFFFF)
+                p = np.searchsorted(cells, cell)
+                if p == n_cells or cells[p] != cell:
+                    continue
+                for t in range(starts[p], ends[p]):
+                    j = items[t]
+                    if seen[j] == i:
+                        continue
+                    seen[j] = i
+                    if x0 < b2[j, 2] and x1 > b2[j, 0] and y0 < b2[j, 3] and y1 > b2[j, 1]:
+                        if k == cap:
+                            cap *= 2
+                            grown_i = np.empty(cap, np.int64)
+                            grown_j = np.empty(cap, np.int64)
+                            grown_i[:k] = out_i[:k]
+                            grown_j[:k] = out_j[:k]
+                            out_i = grown_i
+                            out_j = grown_j
+                        out_i[k] = i
+                        out_j[k] = j
+                        k += 1
+    return out_i[:k], out_j[:k]
+
+
+# 所有内核都以nogil=True编译：内核只访问NumPy数组，执行期间释放GIL，
+# 其他Python线程（如音频或资源加载）可以同时运行
+if NUMBA_AVAILABLE:
+    _compact_rows = njit(cache=True, nogil=True)(_compact_rows)
+    # 带签名在导入时即完成编译（cache=True时从磁盘缓存加载），首帧不再触发JIT
+    collide_frame = njit('Tuple((int64[::1], int64[::1], int64[::1]))'
+                         '(int32[:, ::1], intp[::1], intp[::1], int64, int64, int64, int64, boolean)',
+                         cache=True, nogil=True)(_collide_frame_loop)
+    aabb_pairs_swar = njit(cache=True, nogil=True, parallel=True)(_aabb_pairs_swar_loop)
+    rect_cells = njit(cache=True, nogil=True)(_rect_cells_loop)
+    rect_cells_packed = njit(cache=True, nogil=True)(_rect_cells_packed_loop)
+    hash_pairs = njit(cache=True, nogil=True)(_hash_pairs_loop)
+else:
+    collide_frame = _collide_frame_numpy
+    aabb_pairs_swar = _aabb_pairs_swar_numpy
+    rect_cells = _rect_cells_numpy
+    rect_cells_packed = _rect_cells_packed_numpy
+    hash_pairs = _hash_pairs_numpy
+
+
+# 按固定尺寸特化的SWAR内核源码模板：循环次数写成常量，
+# 便于LLVM对内层循环完全展开和向量化
+_SPECIALIZED_SWAR_TEMPLATE = """
+def aabb_pairs_swar_{n}x{m}(bp, ep):
+    counts = np.zeros({n}, np.int64)
+    buf = np.empty(({n}, {m}), np.int32)
+    for i in range({n}):
+        b_hi = bp[i] >> SWAR_SHIFT
+        b_lo = (bp[i] & SWAR_LOW_HALF) << SWAR_SHIFT
+        c = 0
+        for j in range({m}):
+            a = b_hi | (ep[j] & SWAR_HIGH_HALF)
+            b = (ep[j] & SWAR_LOW_HALF) | b_lo
+            if (((a | SWAR_HIGH_BITS) - b) & SWAR_HIGH_BITS) == SWAR_HIGH_BITS:
+                buf[i, c] = j
+                c += 1
+        counts[i] = c
+    return _compact_rows(counts, buf)
+"""
+
+
+@lru_cache(maxsize=None)
+def make_aabb_pairs_swar(n: int, m: int):
+    """生成按固定尺寸特化的SWAR AABB成对检测内核
+
+    同一组尺寸只生成并编译一次。动态生成的函数没有源文件，
+    无法使用Numba的磁盘缓存，需在计时前调用以完成编译；
+    未安装Numba时特化没有意义，直接返回通用实现。
+
+    Args:
+        n: 第一组矩形数量
+        m: 第二组矩形数量
+
+    Returns:
+        签名与 aabb_pairs_swar 相同、只接受(n,)与(m,)输入的内核
+    """
+    if not NUMBA_AVAILABLE:
+        return aabb_pairs_swar
+    namespace = {
+        'np': np,
+        'SWAR_SHIFT': SWAR_SHIFT,
+        'SWAR_LOW_HALF': SWAR_LOW_HALF,
+        'SWAR_HIGH_HALF': SWAR_HIGH_HALF,
+        'SWAR_HIGH_BITS': SWAR_HIGH_BITS,
+        '_compact_rows': _compact_rows,
+    }
+    exec(_SPECIALIZED_SWAR_TEMPLATE.format(n=n, m=m), namespace)
+    kernel = njit(nogil=True)(namespace[f'aabb_pairs_swar_{n}x{m}'])
+    # 立即编译，避免首次调用时才触发
+    dummy = np.zeros(0, np.uint64)
+    kernel.compile((numba_typeof(dummy), numba_typeof(dummy)))
+    return kernel
+
+
+def warmup():
+    """预编译游戏运行时使用的内核，避免首次调用发生在游戏循环中"""
+    dummy = np.zeros((1, 4), np.int32)
+    idx, cells = rect_cells_packed(dummy, 64)
+    offsets = np.zeros(len(cells), np.int64)
+    hash_pairs(dummy, dummy, 64, cells, offsets, offsets + 1, idx)
+    collide_frame(dummy, np.zeros(1, np.intp), np.zeros(1, np.intp), 0, 0, 0, 0, True)
+
+
+def warmup_benchmark():
+    """预编译只在基准测试中使用的内核，避免把JIT编译时间计入测量
+
+    这些内核（含并行的SWAR内核）不参与游戏运行，不放在warmup()中，
+    游戏启动时不必加载它们和Numba的并行线程层。
+    """
+    dummy = np.zeros((1, 4), np.int32)
+    packed = pack_swar(dummy)
+    aabb_pairs_swar(packed, packed)
+    rect_cells(dummy, 64)
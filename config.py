@@ -30,6 +30,7 @@ PLAYER_SHOOT_COOLDOWN = 10     # 射击冷却时间（帧数）
 ENEMY_BASE_SPEED = 2    # 敌机基础移动速度
 ENEMY_SPAWN_DELAY = 60  # 敌机生成间隔（帧数）
 ENEMY_INITIAL_COUNT = 8 # 初始敌机数量
+ENEMY_DAMAGE_FLASH_FRAMES = 12  # 受伤闪烁持续时间（帧数，约200毫秒）
 
 # 敌机类型配置
 ENEMY_TYPES = {
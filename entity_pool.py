@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+实体位置池
+以SoA形式把子弹、敌机的边界框集中存放在一块连续的NumPy缓冲区中，
+碰撞检测按槽位直接读取，不必逐个访问分散的精灵Rect对象
+"""
+
+import numpy as np
+import pygame
+from typing import List
+from motion_kernels import integrate
+
+# 实体类型
+KIND_NONE = 0
+KIND_BULLET = 1
+KIND_ENEMY = 2
+
+
+class EntityPool:
+    """实体位置池
+    
+    每个实体占用一个槽位，positions[slot] 保存其边界框 (x0, y0, x1, y1)，
+    velocities[slot] 保存其每帧速度 (vx, vy)，可以带小数，积分时与pygame.Rect
+    一样每帧对坐标四舍五入。游戏循环通过 integrate()
+    批量移动实体后再把新位置同步回精灵的Rect；直接修改Rect的代码
+    需调用 write() 写回缓冲区。容量不足时按2倍扩容。
+    """
+    
+    def __init__(self, capacity: int = 256):
+        """初始化实体位置池
+        
+        Args:
+            capacity: 初始槽位数量
+        """
+        self.positions = np.zeros((capacity, 4), np.int32)
+        self.velocities = np.zeros((capacity, 2), np.float64)
+        self.alive = np.zeros(capacity, np.bool_)
+        self.kind = np.zeros(capacity, np.uint8)
+        # 空闲槽位栈，倒序存放以便优先分配小编号槽位
+        self._free: List[int] = list(range(capacity - 1, -1, -1))
+    
+    @property
+    def capacity(self) -> int:
+        """当前槽位容量"""
+        return self.positions.shape[0]
+    
+    def allocate(self, kind: int) -> int:
+        """分配一个槽位
+        
+        Args:
+            kind: 实体类型（KIND_BULLET / KIND_ENEMY）
+            
+        Returns:
+            分配到的槽位编号
+        """
+        if not self._free:
+            self._grow()
+        slot = self._free.pop()
+        self.alive[slot] = True
+        self.kind[slot] = kind
+        return slot
+    
+    def release(self, slot: int):
+        """释放槽位
+        
+        Args:
+            slot: 要释放的槽位编号
+        """
+        if self.alive[slot]:
+            self.alive[slot] = False
+            self.kind[slot] = KIND_NONE
+            self._free.append(slot)
+    
+    def write(self, slot: int, rect: pygame.Rect):
+        """把矩形写入槽位
+        
+        Args:
+            slot: 槽位编号
+            rect: 实体当前的矩形
+        """
+        self.positions[slot] = (rect.x, rect.y, rect.right, rect.bottom)
+    
+    def integrate(self, slots: np.ndarray, bounce_width: int = 0):
+        """按速度批量移动实体
+        
+        Args:
+            slots: 需要移动的槽位数组
+            bounce_width: 水平反弹的边界宽度，为0时不反弹
+        """
+        integrate(self.positions, self.velocities, slots, bounce_width)
+    
+    def gather(self, slots: np.ndarray) -> np.ndarray:
+        """按槽位取出边界框
+        
+        Args:
+            slots: 槽位编号数组
+            
+        Returns:
+            形状为(len(slots), 4)的int32数组
+        """
+        return self.positions[slots]
+    
+    def _grow(self):
+        """容量翻倍"""
+        old = self.capacity
+        new = old * 2
+        positions = np.zeros((new, 4), np.int32)
+        positions[:old] = self.positions
+        velocities = np.zeros((new, 2), np.float64)
+        velocities[:old] = self.velocities
+        alive = np.zeros(new, np.bool_)
+        alive[:old] = self.alive
+        kind = np.zeros(new, np.uint8)
+        kind[:old] = self.kind
+        self.positions, self.velocities = positions, velocities
+        self.alive, self.kind = alive, kind
+        self._free.extend(range(new - 1, old - 1, -1))
+
+
+# 全局实体位置池实例
+_global_entity_pool = EntityPool()
+
+def get_entity_pool() -> EntityPool:
+    """获取全局实体位置池实例"""
+    return _global_entity_pool
@@ -1,14 +1,20 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import logging
 import pygame
 import random
-from sprites import Player, Enemy, Bullet, Explosion
+import numpy as np
+from bisect import bisect_left
+from sprites import Player, Enemy, Bullet
 from sounds import SoundManager
 from state_manager import StateManager, GameState
 from object_pool import PoolManager
-from config import FPS, ENEMY_SPAWN_DELAY, DIFFICULTY_INCREASE_INTERVAL
-from optimized_collision import optimized_groupcollide, optimized_spritecollide, get_collision_detector
+from config import FPS, ENEMY_SPAWN_DELAY, DIFFICULTY_INCREASE_INTERVAL, SCREEN_WIDTH, SCREEN_HEIGHT
+from optimized_collision import get_collision_detector, detect_frame_collisions, FastGroup, SortedEnemies
+from entity_pool import get_entity_pool
+
+log = logging.getLogger(__name__)
 
 # 保持向后兼容的游戏状态常量
 GAME_INIT = 0  # 游戏初始化
@@ -16,9 +22,28 @@ GAME_START = 1  # 游戏开始
 GAME_OVER = 2  # 游戏结束
 GAME_PAUSED = 3  # 游戏暂停
 
+# 敌机类型及各难度段的累积概率分布（普通/快速/重型）
+_ENEMY_TYPES = ("normal", "fast", "heavy")
+_CDF_LOW = [0.80, 0.95, 1.0]   # 低难度主要是普通敌机
+_CDF_MID = [0.60, 0.85, 1.0]   # 中等难度增加特殊敌机
+_CDF_HIGH = [0.50, 0.80, 1.0]  # 高难度更多特殊敌机
+_random = random.random
+
+def _no_sound(name):
+    """未启用音效时的空播放函数"""
+
 class GameLogic:
     """游戏逻辑管理类，负责处理游戏核心逻辑"""
     
+    # 每帧被频繁访问的属性使用槽位存储，省去实例字典查找
+    __slots__ = (
+        'state_manager', 'game_status', 'show_instructions', 'score',
+        'sound_manager', '_play_sound', 'pool_manager', 'collision_detector',
+        'enemy_spawn_timer', 'enemy_spawn_delay', 'base_enemy_spawn_delay',
+        'difficulty_level', 'spawn_cdf', 'damaged_enemies', '_kill_scratch',
+        'enemies', 'bullets', 'explosions', 'player',
+    )
+    
     def __init__(self, sound_manager=None):
         """初始化游戏逻辑"""
         # 状态管理器
@@ -36,7 +61,8 @@ class GameLogic:
         
         # 音效管理器
         self.sound_manager = sound_manager
-        self.sound_enabled = sound_manager is not None
+        # 播放函数只绑定一次，各播放点无需再判断音效是否启用
+        self._play_sound = sound_manager.play_sound if sound_manager else _no_sound
         
         # 对象池管理器
         self.pool_manager = PoolManager()
@@ -49,9 +75,15 @@ class GameLogic:
         self.enemy_spawn_delay = ENEMY_SPAWN_DELAY  # 初始敌机生成间隔
         self.base_enemy_spawn_delay = ENEMY_SPAWN_DELAY  # 基础敌机生成间隔
         self.difficulty_level = 1  # 难度等级
+        self.spawn_cdf = _CDF_LOW  # 当前难度段的敌机类型累积概率分布
+        
+        # 受伤未被摧毁、正在闪烁的敌机
+        self.damaged_enemies = set()
+        
+        # 待回收精灵的临时列表，跨帧复用，避免遍历时复制精灵组
+        self._kill_scratch = []
         
         # 精灵组
-        self.all_sprites = None
         self.enemies = None
         self.bullets = None
         self.explosions = None
@@ -59,39 +91,44 @@ class GameLogic:
     
     def _register_state_callbacks(self):
         """注册状态变化回调函数"""
-        # 注册进入游戏状态的回调
-        self.state_manager.register_enter_callback(GameState.PLAYING, self._on_enter_playing)
-        self.state_manager.register_enter_callback(GameState.PAUSED, self._on_enter_paused)
-        self.state_manager.register_enter_callback(GameState.GAME_OVER, self._on_enter_game_over)
-        self.state_manager.register_enter_callback(GameState.INSTRUCTIONS, self._on_enter_instructions)
-        
-        # 注册退出游戏状态的回调
-        self.state_manager.register_exit_callback(GameState.PLAYING, self._on_exit_playing)
-        self.state_manager.register_exit_callback(GameState.PAUSED, self._on_exit_paused)
+        self.state_manager.register_callbacks(
+            # 进入游戏状态的回调
+            {
+                GameState.PLAYING: self._on_enter_playing,
+                GameState.PAUSED: self._on_enter_paused,
+                GameState.GAME_OVER: self._on_enter_game_over,
+                GameState.INSTRUCTIONS: self._on_enter_instructions,
+            },
+            # 退出游戏状态的回调
+            {
+                GameState.PLAYING: self._on_exit_playing,
+                GameState.PAUSED: self._on_exit_paused,
+            },
+        )
     
     def _on_enter_playing(self):
         """进入游戏状态时的回调"""
-        print("进入游戏状态")
+        log.debug("进入游戏状态")
     
     def _on_enter_paused(self):
         """进入暂停状态时的回调"""
-        print("游戏暂停")
+        log.debug("游戏暂停")
     
     def _on_enter_game_over(self):
         """进入游戏结束状态时的回调"""
-        print("游戏结束")
+        log.debug("游戏结束")
     
     def _on_enter_instructions(self):
         """进入操作说明状态时的回调"""
-        print("显示操作说明")
+        log.debug("显示操作说明")
     
     def _on_exit_playing(self):
         """退出游戏状态时的回调"""
-        print("退出游戏状态")
+        log.debug("退出游戏状态")
     
     def _on_exit_paused(self):
         """退出暂停状态时的回调"""
-        print("退出暂停状态")
+        log.debug("退出暂停状态")
     
     def start_game(self):
         """开始游戏"""
@@ -105,16 +142,16 @@ class GameLogic:
         self.enemy_spawn_delay = ENEMY_SPAWN_DELAY
         self.base_enemy_spawn_delay = ENEMY_SPAWN_DELAY
         self.difficulty_level = 1
+        self.spawn_cdf = _CDF_LOW
+        self.damaged_enemies.clear()
         
         # 创建精灵组
-        self.all_sprites = pygame.sprite.Group()
-        self.enemies = pygame.sprite.Group()
-        self.bullets = pygame.sprite.Group()
+        self.enemies = SortedEnemies()
+        self.bullets = FastGroup()
         self.explosions = pygame.sprite.Group()
         
         # 创建玩家飞机
         self.player = Player()
-        self.all_sprites.add(self.player)
         
         # 创建初始敌机
         for i in range(8):
@@ -127,15 +164,19 @@ class GameLogic:
             self.game_status = GAME_OVER
             
             # 清理所有精灵并返回到对象池
+            scratch = self._kill_scratch
             if self.bullets:
-                for bullet in self.bullets.copy():
-                    bullet.kill()
+                scratch.clear()
+                scratch.extend(self.bullets.dense)
+                for bullet in scratch:
                     self.pool_manager.return_bullet(bullet)
             
             if self.enemies:
-                for enemy in self.enemies.copy():
-                    enemy.kill()
+                scratch.clear()
+                scratch.extend(self.enemies.dense)
+                for enemy in scratch:
                     self.pool_manager.return_enemy(enemy)
+            scratch.clear()
     
     def toggle_pause(self):
         """切换暂停状态"""
@@ -162,18 +203,30 @@ class GameLogic:
             if self.state_manager.show_instructions():
                 self.show_instructions = True
     
-    def update(self):
-        """更新游戏状态"""
-        # 使用状态管理器检查游戏状态
-        if self.state_manager.is_playing():
+    def update(self, state=None, keystate=None, now=None):
+        """更新游戏状态
+        
+        Args:
+            state: 本帧的游戏状态，由主循环每帧获取一次后传入；为None时自行查询
+            keystate: 本帧的按键状态快照，为None时由玩家飞机自行获取
+            now: 本帧的时间戳（毫秒），由主循环每帧获取一次后传入；为None时自行查询
+        """
+        if state is None:
+            state = self.state_manager.get_current_state()
+        if state == GameState.PLAYING:
+            if now is None:
+                now = pygame.time.get_ticks()
             # 更新难度等级
             self.update_difficulty()
             
-            # 更新所有精灵
-            self.all_sprites.update()
+            # 更新玩家和爆炸效果，子弹和敌机在实体位置池上批量移动并清理越界精灵
+            self.player.update(keystate, now)
+            self.explosions.update(now)
+            self.move_entities()
+            self.update_damage_flash()
             
-            # 清理超出屏幕的精灵
-            self.cleanup_offscreen_sprites()
+            # 检测碰撞
+            self.check_collisions(state, now)
             
             # 生成敌机
             self.enemy_spawn_timer += 1
@@ -181,84 +234,130 @@ class GameLogic:
                 self.spawn_enemy()
                 self.enemy_spawn_timer = 0
     
-    def handle_player_shooting(self, is_shooting):
-        """处理玩家射击"""
-        if self.state_manager.is_playing() and is_shooting and self.player and self.player.can_shoot():
-            # 从对象池获取子弹
-            bullet = self.pool_manager.get_bullet(self.player.rect.centerx, self.player.rect.top)
+    def move_entities(self):
+        """批量移动子弹和敌机，再把新位置同步回精灵的Rect并对敌机重新排序
+        
+        移动后先按实体位置池中的边界框回收越界的精灵，剩下的精灵才同步Rect、
+        参与排序和本帧的碰撞检测。
+        """
+        pool = get_entity_pool()
+        pool.integrate(self.bullets.slot_ids)
+        pool.integrate(self.enemies.slot_ids, SCREEN_WIDTH)
+        
+        # 清理超出屏幕的精灵
+        self.cleanup_offscreen_sprites()
+        
+        positions = pool.positions
+        for group in (self.bullets, self.enemies):
+            for sprite, topleft in zip(group.dense, positions[group.slot_ids, :2].tolist()):
+                sprite.rect.topleft = topleft
+        
+        # 敌机位置更新后按纵坐标重排一次，供碰撞检测二分截取候选范围
+        self.enemies.sort_by_top()
+        # 位置已变化，通用碰撞检测器的空间哈希表在下一次查询时重建
+        self.collision_detector.new_frame()
+    
+    def handle_player_shooting(self, is_shooting, state=None):
+        """处理玩家射击
+        
+        Args:
+            is_shooting: 是否按下射击键
+            state: 本帧的游戏状态，为None时自行查询
+        """
+        if state is None:
+            state = self.state_manager.get_current_state()
+        if state == GameState.PLAYING and is_shooting and self.player:
+            # 玩家从对象池获取子弹并处理射击冷却
+            bullet = self.player.shoot(self.pool_manager)
             if bullet:
                 self.bullets.add(bullet)
-                self.all_sprites.add(bullet)
                 # 播放射击音效
-                if self.sound_enabled and self.sound_manager:
-                    self.sound_manager.play_sound('shoot')
-                # 重置射击冷却
-                self.player.reset_shoot_cooldown()
+                self._play_sound('shoot')
     
-    def check_collisions(self):
-        """检测碰撞（使用优化算法）"""
-        if not self.state_manager.is_playing():
+    def check_collisions(self, state=None, now=None):
+        """检测碰撞（使用优化算法）
+        
+        子弹-敌机与玩家-敌机的碰撞在实体位置池上一次扫描完成，
+        这里只遍历返回的下标列表并应用击中、计分和回收逻辑。
+        
+        Args:
+            state: 本帧的游戏状态，为None时自行查询
+            now: 本帧的时间戳（毫秒），为None时由玩家飞机自行获取
+        """
+        if state is None:
+            state = self.state_manager.get_current_state()
+        if state != GameState.PLAYING:
             return
         
-        # 使用优化的碰撞检测算法
-        # 检测子弹与敌机的碰撞
-        hits = optimized_groupcollide(self.bullets, self.enemies, False, False)
-        for bullet, enemy_list in hits.items():
-            for enemy in enemy_list:
-                # 敌机被击中
-                if enemy.hit():  # 如果敌机被摧毁
-                    self.score += enemy.score_value
-                    enemy.kill()
-                    
-                    # 将敌机返回到对象池
-                    self.pool_manager.return_enemy(enemy)
-                    
-                    # 播放爆炸音效
-                    if self.sound_enabled and self.sound_manager:
-                        self.sound_manager.play_sound('explosion')
-                    
-                    # 创建爆炸效果
-                    explosion = Explosion(enemy.rect.center)
-                    self.explosions.add(explosion)
-                    self.all_sprites.add(explosion)
-                    
-                    # 生成新的敌机
-                    self.spawn_enemy()
-                else:
-                    # 敌机受伤但未被摧毁，设置受伤效果定时器
-                    pygame.time.set_timer(pygame.USEREVENT + 1, 200)  # 200ms后恢复
-                
-                # 子弹击中敌机后销毁，返回到对象池
-                bullet.kill()
+        # 先复制稠密列表，处理碰撞时的kill()会调整组内顺序
+        bullets = list(self.bullets.dense)
+        enemies = list(self.enemies.dense)
+        player_rect = self.player.rect if self.player else None
+        (bullet_idx, enemy_idx), player_idx = detect_frame_collisions(
+            get_entity_pool(), self.bullets, self.enemies, player_rect)
+        
+        # 本帧已被摧毁的敌机。回收后的敌机会被对象池复用，不能用alive()判断，
+        # 补充的新敌机也统一放到两轮处理之后再生成
+        destroyed = set()
+        
+        # 检测子弹与敌机的碰撞，每颗子弹只对应它碰到的第一个敌机
+        for i, j in zip(bullet_idx, enemy_idx):
+            bullet = bullets[i]
+            enemy = enemies[j]
+            # 同一帧内已被摧毁的敌机不再受击，但子弹碰到它仍然销毁
+            if enemy in destroyed:
                 self.pool_manager.return_bullet(bullet)
-                break  # 子弹只能击中一个敌机
-        
-        # 检测玩家与敌机的碰撞（使用优化算法）
-        if self.player:
-            hits = optimized_spritecollide(self.player, self.enemies, False)
-            for hit in hits:
-                if self.player.hit():
-                    # 创建爆炸效果
-                    explosion = Explosion(hit.rect.center)
-                    self.explosions.add(explosion)
-                    self.all_sprites.add(explosion)
-                    # 播放被击中音效
-                    if self.sound_enabled and self.sound_manager:
-                        self.sound_manager.play_sound('hit')
+                continue
+            
+            # 敌机被击中
+            if enemy.hit():  # 如果敌机被摧毁
+                self.score += enemy.score_value
+                destroyed.add(enemy)
+                self.pool_manager.return_enemy(enemy)
                 
-                # 敌机与玩家碰撞后销毁，返回到对象池
-                hit.kill()
-                self.pool_manager.return_enemy(hit)
+                # 播放爆炸音效
+                self._play_sound('explosion')
                 
-                # 生成新的敌机
-                self.spawn_enemy()
-                
-                # 检查游戏是否结束
-                if self.player.lives <= 0:
-                    self.game_over()
-                    # 播放游戏结束音效
-                    if self.sound_enabled and self.sound_manager:
-                        self.sound_manager.play_sound('game_over')
+                # 创建爆炸效果
+                explosion = self.pool_manager.get_explosion(enemy.rect.center)
+                self.explosions.add(explosion)
+            else:
+                # 敌机受伤但未被摧毁，记录下来逐帧推进闪烁效果
+                self.damaged_enemies.add(enemy)
+            
+            # 子弹击中敌机后销毁，返回到对象池
+            self.pool_manager.return_bullet(bullet)
+        
+        # 检测玩家与敌机的碰撞
+        player_dead = False
+        for j in player_idx:
+            hit = enemies[j]
+            if hit in destroyed:
+                continue
+            if self.player.hit(now):
+                # 创建爆炸效果
+                explosion = self.pool_manager.get_explosion(hit.rect.center)
+                self.explosions.add(explosion)
+                # 播放被击中音效
+                self._play_sound('hit')
+            
+            # 敌机与玩家碰撞后销毁，返回到对象池
+            destroyed.add(hit)
+            self.pool_manager.return_enemy(hit)
+            
+            if self.player.lives <= 0:
+                player_dead = True
+                break
+        
+        # 每摧毁一架敌机生成一架新的敌机
+        for _ in range(len(destroyed)):
+            self.spawn_enemy()
+        
+        # 检查游戏是否结束
+        if player_dead:
+            self.game_over()
+            # 播放游戏结束音效
+            self._play_sound('game_over')
     
     def update_difficulty(self):
         """根据分数更新游戏难度"""
@@ -273,53 +372,73 @@ class GameLogic:
             
             # 调整敌机速度（通过修改Enemy类的速度）
             Enemy.base_speed = min(8, 2 + (self.difficulty_level - 1) * 0.5)
+            
+            # 切换敌机类型的概率分布
+            if self.difficulty_level <= 2:
+                self.spawn_cdf = _CDF_LOW
+            elif self.difficulty_level <= 5:
+                self.spawn_cdf = _CDF_MID
+            else:
+                self.spawn_cdf = _CDF_HIGH
     
     def spawn_enemy(self):
         """生成敌机"""
-        # 根据难度等级决定敌机类型
-        enemy_types = ["normal", "fast", "heavy"]
-        
-        # 基础概率：普通敌机70%，快速敌机20%，重型敌机10%
-        if self.difficulty_level <= 2:
-            # 低难度主要是普通敌机
-            enemy_type = random.choices(enemy_types, weights=[80, 15, 5])[0]
-        elif self.difficulty_level <= 5:
-            # 中等难度增加特殊敌机
-            enemy_type = random.choices(enemy_types, weights=[60, 25, 15])[0]
-        else:
-            # 高难度更多特殊敌机
-            enemy_type = random.choices(enemy_types, weights=[50, 30, 20])[0]
+        # 使用难度变化时选好的累积概率分布，一次随机数加二分查找决定敌机类型
+        enemy_type = _ENEMY_TYPES[bisect_left(self.spawn_cdf, _random())]
         
         # 从对象池获取敌机
         enemy = self.pool_manager.get_enemy(enemy_type)
-        if enemy and self.all_sprites and self.enemies:
-            self.all_sprites.add(enemy)
+        # 空的精灵组布尔值为False，这里必须与None比较，否则敌机永远不会加入组中
+        if enemy and self.enemies is not None:
             self.enemies.add(enemy)
     
     def cleanup_offscreen_sprites(self):
-        """清理超出屏幕的精灵并返回到对象池"""
-        from config import SCREEN_HEIGHT, SCREEN_WIDTH
+        """清理超出屏幕的精灵并返回到对象池
+        
+        直接在实体位置池的边界框上做向量化比较得到越界下标，
+        只对越界的精灵执行Python级的回收操作。
+        """
+        sh = SCREEN_HEIGHT
+        sw = SCREEN_WIDTH
+        positions = get_entity_pool().positions
+        scratch = self._kill_scratch
         
-        # 清理超出屏幕的子弹
-        for bullet in self.bullets.copy():
-            if bullet.rect.bottom < 0 or bullet.rect.top > SCREEN_HEIGHT:
-                bullet.kill()
+        # 清理超出屏幕的子弹：先收集再回收，回收会调整组内的稠密列表顺序
+        b = positions[self.bullets.slot_ids]
+        dead = np.flatnonzero((b[:, 3] < 0) | (b[:, 1] > sh))
+        if len(dead):
+            dense = self.bullets.dense
+            scratch.clear()
+            for i in dead.tolist():
+                scratch.append(dense[i])
+            for bullet in scratch:
                 self.pool_manager.return_bullet(bullet)
         
         # 清理超出屏幕的敌机
-        for enemy in self.enemies.copy():
-            if enemy.rect.top > SCREEN_HEIGHT or enemy.rect.right < 0 or enemy.rect.left > SCREEN_WIDTH:
-                enemy.kill()
+        e = positions[self.enemies.slot_ids]
+        dead = np.flatnonzero((e[:, 1] > sh) | (e[:, 2] < 0) | (e[:, 0] > sw))
+        if len(dead):
+            dense = self.enemies.dense
+            scratch.clear()
+            for i in dead.tolist():
+                scratch.append(dense[i])
+            for enemy in scratch:
                 self.pool_manager.return_enemy(enemy)
+        
+        # 不保留对已回收精灵的引用
+        scratch.clear()
     
-    def handle_enemy_damage_recovery(self):
-        """处理敌机受伤后的恢复"""
-        # 恢复受伤敌机的透明度
-        if self.enemies:
-            for enemy in self.enemies:
-                if enemy.health > 0:
-                    enemy.image.set_alpha(255)
-        pygame.time.set_timer(pygame.USEREVENT + 1, 0)  # 取消定时器
+    def update_damage_flash(self):
+        """推进受伤敌机的闪烁效果，结束或已被回收的敌机移出集合"""
+        if not self.damaged_enemies:
+            return
+        scratch = self._kill_scratch
+        scratch.clear()
+        for enemy in self.damaged_enemies:
+            if not enemy.alive() or not enemy.tick_damage_flash():
+                scratch.append(enemy)
+        self.damaged_enemies.difference_update(scratch)
+        scratch.clear()
     
     def get_game_data(self):
         """获取游戏数据用于渲染"""
@@ -329,6 +448,8 @@ class GameLogic:
             'score': self.score,
             'difficulty_level': self.difficulty_level,
             'player_lives': self.player.lives if self.player else 0,
-            'all_sprites': self.all_sprites,
+            'enemies': self.enemies,
+            'bullets': self.bullets,
+            'explosions': self.explosions,
             'player': self.player
         }
\ No newline at end of file
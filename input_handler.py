@@ -9,67 +9,83 @@ from state_manager import GameState
 class InputHandler:
     """输入处理类，负责处理用户输入和游戏控制"""
     
+    __slots__ = ('game_logic', 'keys_pressed', '_keystate', '_event_handlers', '_key_handlers')
+    
     def __init__(self, game_logic):
         """初始化输入处理器"""
         self.game_logic = game_logic
         self.keys_pressed = set()  # 当前按下的键
+        self._keystate = pygame.key.get_pressed()  # 本帧的按键状态快照
+        
+        # 事件类型到处理函数的分发表
+        self._event_handlers = {
+            pygame.QUIT: self._handle_quit,
+            pygame.KEYDOWN: self._handle_keydown,
+            pygame.KEYUP: self._handle_keyup,
+        }
+        
+        # 按键到处理函数的分发表
+        self._key_handlers = {
+            pygame.K_ESCAPE: self._on_escape,
+            pygame.K_SPACE: self._on_space,
+            pygame.K_p: self._on_pause,
+            pygame.K_h: self._on_help,
+        }
     
     def handle_events(self):
         """处理游戏事件"""
         quit_requested = False
+        handlers = self._event_handlers
         
         for event in pygame.event.get():
-            # 退出游戏
-            if event.type == pygame.QUIT:
+            # 按事件类型查表分发，处理函数返回True表示请求退出
+            handler = handlers.get(event.type)
+            if handler is not None and handler(event):
                 quit_requested = True
-            
-            # 处理按键按下事件
-            elif event.type == pygame.KEYDOWN:
-                if self._handle_keydown(event):
-                    quit_requested = True
-            
-            # 处理按键释放事件
-            elif event.type == pygame.KEYUP:
-                self._handle_keyup(event)
-            
-            # 处理自定义事件
-            elif event.type == pygame.USEREVENT + 1:
-                # 恢复受伤敌机的透明度
-                self.game_logic.handle_enemy_damage_recovery()
+        
+        # 事件处理完后获取一次按键状态，本帧其余使用者直接读取这份快照
+        self._keystate = pygame.key.get_pressed()
         
         return quit_requested
     
+    def _handle_quit(self, event):
+        """处理退出事件"""
+        return True
+    
     def _handle_keydown(self, event):
         """处理按键按下事件"""
         key = event.key
-        quit_requested = False
         
         # 添加到按下的键集合
         self.keys_pressed.add(key)
         
-        # 获取当前状态
-        current_state = self.game_logic.state_manager.get_current_state()
-        
-        # ESC键退出游戏
-        if key == pygame.K_ESCAPE:
-            quit_requested = True
-        
-        # 空格键开始游戏或射击
-        elif key == pygame.K_SPACE:
-            if current_state in [GameState.INIT, GameState.GAME_OVER]:
-                self.game_logic.start_game()
-        
-        # P键暂停/继续游戏
-        elif key == pygame.K_p:
-            if current_state in [GameState.PLAYING, GameState.PAUSED]:
-                self.game_logic.toggle_pause()
-        
-        # H键切换操作说明显示
-        elif key == pygame.K_h:
-            if current_state in [GameState.INIT, GameState.GAME_OVER]:
-                self.game_logic.toggle_instructions()
-        
-        return quit_requested
+        # 按键查表分发，传入当前状态
+        handler = self._key_handlers.get(key)
+        if handler is None:
+            return False
+        return handler(self.game_logic.state_manager.get_current_state())
+    
+    def _on_escape(self, current_state):
+        """ESC键退出游戏"""
+        return True
+    
+    def _on_space(self, current_state):
+        """空格键开始游戏（射击由持续输入处理）"""
+        if current_state in (GameState.INIT, GameState.GAME_OVER):
+            self.game_logic.start_game()
+        return False
+    
+    def _on_pause(self, current_state):
+        """P键暂停/继续游戏"""
+        if current_state in (GameState.PLAYING, GameState.PAUSED):
+            self.game_logic.toggle_pause()
+        return False
+    
+    def _on_help(self, current_state):
+        """H键切换操作说明显示"""
+        if current_state in (GameState.INIT, GameState.GAME_OVER):
+            self.game_logic.toggle_instructions()
+        return False
     
     def _handle_keyup(self, event):
         """处理按键释放事件"""
@@ -78,20 +94,27 @@ class InputHandler:
         # 从按下的键集合中移除
         self.keys_pressed.discard(key)
     
-    def update_continuous_input(self):
-        """更新持续输入（如移动和射击）"""
+    def update_continuous_input(self, state=None):
+        """更新持续输入（如移动和射击）
+        
+        Args:
+            state: 本帧的游戏状态，由主循环每帧获取一次后传入；为None时自行查询
+        """
+        if state is None:
+            state = self.game_logic.state_manager.get_current_state()
+        
         # 只有在游戏进行状态才处理持续输入
-        if not self.game_logic.state_manager.is_playing():
+        if state != GameState.PLAYING:
             return
         
-        # 获取当前按键状态
-        keystate = pygame.key.get_pressed()
+        # 使用handle_events中缓存的按键状态
+        keystate = self._keystate
         
         # 处理玩家移动
         self._handle_player_movement(keystate)
         
         # 处理玩家射击
-        self._handle_player_shooting(keystate)
+        self._handle_player_shooting(keystate, state)
     
     def _handle_player_movement(self, keystate):
         """处理玩家移动"""
@@ -99,17 +122,22 @@ class InputHandler:
         # 这里不需要额外的移动调用，因为Player.update()会自动处理按键状态
         pass
     
-    def _handle_player_shooting(self, keystate):
+    def _handle_player_shooting(self, keystate, state=None):
         """处理玩家射击"""
         # 空格键射击
         is_shooting = keystate[pygame.K_SPACE]
-        self.game_logic.handle_player_shooting(is_shooting)
+        self.game_logic.handle_player_shooting(is_shooting, state)
     
     def _quit_game(self):
         """退出游戏"""
         pygame.quit()
         sys.exit()
     
+    @property
+    def keystate(self):
+        """本帧的按键状态快照，由handle_events每帧刷新一次"""
+        return self._keystate
+    
     def is_key_pressed(self, key):
         """检查指定键是否被按下"""
         return key in self.keys_pressed
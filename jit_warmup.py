@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JIT预热模块
+在游戏启动阶段统一调用一次所有Numba内核，触发编译或从磁盘缓存加载，
+避免首次调用发生在游戏循环中造成掉帧
+"""
+
+import time
+import collision_kernels
+import motion_kernels
+
+
+def warmup_all() -> float:
+    """预热所有JIT内核
+    
+    未安装Numba时各内核为NumPy实现，调用开销可以忽略。
+    
+    Returns:
+        预热耗时（秒）
+    """
+    start_time = time.perf_counter()
+    collision_kernels.warmup()
+    motion_kernels.warmup()
+    return time.perf_counter() - start_time
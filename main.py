@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import logging
 import pygame
 import sys
 from game_logic import GameLogic
@@ -8,14 +9,24 @@ from renderer import Renderer
 from input_handler import InputHandler
 from state_manager import StateManager, GameState
 from config import SCREEN_WIDTH, SCREEN_HEIGHT, FPS
+from jit_warmup import warmup_all
+
+def _idle(state):
+    """无需逐帧更新逻辑的状态"""
 
 class Game:
     """游戏主类 - 重构后的简化版本"""
     
+    __slots__ = ('screen', 'clock', 'game_logic', 'renderer', 'input_handler',
+                 'state_manager', '_tick')
+    
     def __init__(self):
         """初始化游戏"""
         pygame.init()
         
+        # 预热JIT内核，把编译/加载缓存的时间放在进入游戏循环之前
+        warmup_all()
+        
         # 设置窗口
         self.screen = pygame.display.set_mode((800, 600))
         pygame.display.set_caption("飞机大战")
@@ -31,8 +42,19 @@ class Game:
         # 获取状态管理器的引用
         self.state_manager = self.game_logic.state_manager
         
-        # 设置敌机受伤效果计时器
-        pygame.time.set_timer(pygame.USEREVENT + 1, 100)  # 每100ms检查一次
+        # 各状态的逐帧处理函数，主循环每帧只做一次字典查找
+        self._tick = {
+            GameState.INIT: _idle,          # 初始化状态：等待用户开始游戏
+            GameState.PLAYING: self._tick_playing,
+            GameState.PAUSED: _idle,        # 暂停状态：不更新游戏逻辑，只处理输入
+            GameState.GAME_OVER: _idle,     # 游戏结束状态：等待重新开始或退出
+            GameState.INSTRUCTIONS: _idle,  # 操作说明状态：显示说明
+        }
+    
+    def _tick_playing(self, state):
+        """游戏进行状态：更新游戏逻辑，本帧状态和时间戳只获取一次并向下传递"""
+        self.input_handler.update_continuous_input(state)
+        self.game_logic.update(state, self.input_handler.keystate, pygame.time.get_ticks())
     
 
     
@@ -55,25 +77,9 @@ class Game:
                 running = False
                 break
             
-            # 根据当前状态执行不同的逻辑
+            # 根据当前状态执行不同的逻辑：查表得到本状态的帧处理函数
             current_state = self.state_manager.get_current_state()
-            
-            if current_state == GameState.INIT:
-                # 初始化状态：等待用户开始游戏
-                pass
-            elif current_state == GameState.PLAYING:
-                # 游戏进行状态：更新游戏逻辑
-                self.input_handler.update_continuous_input()
-                self.game_logic.update()
-            elif current_state == GameState.PAUSED:
-                # 暂停状态：不更新游戏逻辑，只处理输入
-                pass
-            elif current_state == GameState.GAME_OVER:
-                # 游戏结束状态：等待重新开始或退出
-                pass
-            elif current_state == GameState.INSTRUCTIONS:
-                # 操作说明状态：显示说明
-                pass
+            self._tick.get(current_state, _idle)(current_state)
             
             # 渲染游戏画面（所有状态都需要渲染）
             game_data = self.game_logic.get_game_data()
@@ -89,5 +95,7 @@ class Game:
 
 # 游戏入口
 if __name__ == "__main__":
+    # 发布版只输出警告及以上日志，状态回调中的调试日志不做格式化和输出
+    logging.basicConfig(level=logging.WARNING)
     game = Game()
     game.run()
\ No newline at end of file
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+运动积分计算内核
+在实体位置池的SoA数组上批量更新子弹和敌机的位置，
+未安装Numba时自动回退到NumPy向量化实现
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # Numba为可选依赖
+    NUMBA_AVAILABLE = False
+    prange = range
+
+# 实体数量达到该值时才使用并行版本，数量较少时启动线程的固定开销
+# 远大于积分本身的耗时
+PARALLEL_MIN_ENTITIES = 8192
+
+
+def _round_half_away_numpy(t: np.ndarray) -> np.ndarray:
+    """按pygame.Rect的规则（四舍五入，0.5远离零）把浮点坐标取整"""
+    return np.copysign(np.floor(np.abs(t) + 0.5), t)
+
+
+def _integrate_numpy(positions: np.ndarray, velocities: np.ndarray, slots: np.ndarray, bounce_width: int):
+    """NumPy版本的位置积分（Numba不可用时的回退实现）"""
+    pos = positions[slots]
+    start = pos[:, :2]
+    step = (_round_half_away_numpy(start + velocities[slots]) - start).astype(np.int32)
+    pos += np.tile(step, 2)
+    positions[slots] = pos
+    if bounce_width > 0:
+        out = (pos[:, 0] < 0) | (pos[:, 2] > bounce_width)
+        velocities[slots[out], 0] *= -1
+
+
+def _round_half_away(t):
+    """按pygame.Rect的规则（四舍五入，0.5远离零）把浮点坐标取整"""
+    if t >= 0:
+        return np.floor(t + 0.5)
+    return -np.floor(-t + 0.5)
+
+
+def _integrate_loop(positions, velocities, slots, bounce_width):
+    """按槽位把速度累加到边界框上
+
+    速度可以带小数。与对pygame.Rect的坐标做 += 相同，每帧把整数坐标加上
+    速度后再四舍五入（0.5远离零），所以同一个小数速度在负坐标处的实际位移
+    可能与非负坐标处不同；边界框的另一角随之平移相同的距离。
+    每个实体只写入自己槽位的那一行，各次迭代的存储目标互不重叠，
+    可以直接用prange并行。bounce_width大于0时，实体越过左右边界后
+    水平速度取反（敌机碰到屏幕左右边界时反弹）。
+
+    Args:
+        positions: 实体位置池的(N, 4) int32边界框数组，原地修改
+        velocities: 实体位置池的(N, 2) float64速度数组 (vx, vy)
+        slots: 需要更新的槽位数组
+        bounce_width: 水平反弹的边界宽度，为0时不反弹
+    """
+    for i in prange(slots.shape[0]):
+        s = slots[i]
+        vx = velocities[s, 0]
+        x0 = positions[s, 0]
+        y0 = positions[s, 1]
+        dx = np.int32(_round_half_away(x0 + vx)) - x0
+        dy = np.int32(_round_half_away(y0 + velocities[s, 1])) - y0
+        positions[s, 0] = x0 + dx
+        positions[s, 1] = y0 + dy
+        positions[s, 2] += dx
+        positions[s, 3] += dy
+        if bounce_width > 0 and (positions[s, 0] < 0 or positions[s, 2] > bounce_width):
+            velocities[s, 0] = -vx
+
+
+# 以nogil=True编译，内核执行期间释放GIL
+if NUMBA_AVAILABLE:
+    _round_half_away = njit(cache=True, nogil=True, inline='always')(_round_half_away)
+    _integrate_serial = njit(cache=True, nogil=True)(_integrate_loop)
+    _integrate_parallel = njit(cache=True, nogil=True, parallel=True)(_integrate_loop)
+else:
+    _integrate_serial = _integrate_numpy
+    _integrate_parallel = _integrate_numpy
+
+
+def integrate(positions: np.ndarray, velocities: np.ndarray, slots: np.ndarray, bounce_width: int = 0):
+    """按槽位积分实体位置，实体数量较多时使用并行内核
+
+    Args:
+        positions: 实体位置池的(N, 4) int32边界框数组，原地修改
+        velocities: 实体位置池的(N, 2) float64速度数组
+        slots: 需要更新的槽位数组
+        bounce_width: 水平反弹的边界宽度，为0时不反弹
+    """
+    if len(slots) >= PARALLEL_MIN_ENTITIES:
+        _integrate_parallel(positions, velocities, slots, bounce_width)
+    else:
+        _integrate_serial(positions, velocities, slots, bounce_width)
+
+
+def warmup():
+    """预编译所有内核"""
+    positions = np.zeros((1, 4), np.int32)
+    velocities = np.zeros((1, 2), np.float64)
+    slots = np.zeros(1, np.intp)
+    _integrate_serial(positions, velocities, slots, 1)
+    _integrate_parallel(positions, velocities, slots, 1)
@@ -6,9 +6,11 @@
 """
 
 import pygame
-from typing import List, Optional, Type, Any
+import numpy as np
+from typing import Dict, List, Optional, Type, Any
 from abc import ABC, abstractmethod
-from sprites import Bullet, Enemy
+from config import BULLET_SPEED, SCREEN_WIDTH
+from sprites import Bullet, Enemy, Explosion
 
 
 class ObjectPool(ABC):
@@ -28,7 +30,8 @@ class ObjectPool(ABC):
         self.initial_size = initial_size
         self.max_size = max_size
         self.available_objects: List[Any] = []
-        self.active_objects: List[Any] = []
+        # 活跃对象用字典当作有序集合：成员判断和移除为O(1)，并保留获取顺序
+        self.active_objects: Dict[Any, None] = {}
         
         # 预创建初始对象
         self._initialize_pool()
@@ -62,15 +65,15 @@ class ObjectPool(ABC):
             obj = self.available_objects.pop()
             # 重置对象状态
             obj = self._reset_object(obj, *args, **kwargs)
-            # 添加到活跃对象列表
-            self.active_objects.append(obj)
+            # 添加到活跃对象集合
+            self.active_objects[obj] = None
             return obj
         elif len(self.active_objects) < self.max_size:
             # 如果没有可用对象但未达到最大大小，创建新对象
             obj = self._create_object()
             if obj:
                 obj = self._reset_object(obj, *args, **kwargs)
-                self.active_objects.append(obj)
+                self.active_objects[obj] = None
                 return obj
         
         # 池已满或创建失败
@@ -84,7 +87,7 @@ class ObjectPool(ABC):
             obj: 要返回的对象
         """
         if obj in self.active_objects:
-            self.active_objects.remove(obj)
+            del self.active_objects[obj]
             # 清理对象状态
             self._cleanup_object(obj)
             # 如果池未满，将对象放回可用列表
@@ -162,13 +165,14 @@ class BulletPool(ObjectPool):
         bullet.rect.bottom = y
         
         # 重置速度（确保子弹向上移动）
-        from config import BULLET_SPEED
         bullet.speed = -BULLET_SPEED
-        
-        # 确保子弹可见
-        bullet.image.set_alpha(255)
+        bullet.sync_slot()
         
         return bullet
+    
+    def _cleanup_object(self, bullet: Bullet):
+        """回收子弹：池内对象都是精灵，直接从所有组中移除"""
+        bullet.kill()
 
 
 class EnemyPool(ObjectPool):
@@ -177,10 +181,22 @@ class EnemyPool(ObjectPool):
     专门管理敌机对象的创建、回收和重用
     """
     
+    # 每次批量生成的敌机随机参数组数
+    SPAWN_ROLL_BATCH = 1024
+    
     def __init__(self, initial_size: int = 15, max_size: int = 50):
         """初始化敌机对象池"""
+        # 敌机重置所需的随机数由NumPy成批生成，每次重置只取出一组
+        self._rng = np.random.default_rng()
+        self._spawn_rolls: List[List[float]] = []
         super().__init__(initial_size, max_size)
     
+    def _next_spawn_roll(self) -> List[float]:
+        """取出一组[0, 1)均匀随机数（x位置、y位置、纵向速度、横向速度），用完时整批补充"""
+        if not self._spawn_rolls:
+            self._spawn_rolls = self._rng.random((self.SPAWN_ROLL_BATCH, 4)).tolist()
+        return self._spawn_rolls.pop()
+    
     def _create_object(self) -> Enemy:
         """创建新的敌机对象"""
         # 创建一个默认类型的敌机，稍后会重置类型和位置
@@ -197,25 +213,81 @@ class EnemyPool(ObjectPool):
         Returns:
             重置后的敌机对象
         """
-        import random
-        from config import SCREEN_WIDTH
-        
-        # 重置敌机类型和属性
+        # 重置敌机类型和属性，图像换成该类型的共享图像（同时结束受伤闪烁）
         enemy.enemy_type = enemy_type
         enemy.setup_enemy_properties()
+        enemy.rect.size = enemy.image.get_size()
         
-        # 重置位置
-        enemy.rect.x = random.randint(0, SCREEN_WIDTH - enemy.rect.width)
-        enemy.rect.y = random.randrange(-100, -40)
+        # 重置位置，取值范围与random.randint/randrange的版本相同
+        rx, ry, rsy, rsx = self._next_spawn_roll()
+        enemy.rect.x = int(rx * (SCREEN_WIDTH - enemy.rect.width + 1))
+        enemy.rect.y = -100 + int(ry * 60)
+        enemy.sync_slot()
         
         # 重置移动速度
-        enemy.speed_y = enemy.base_speed_y + random.randrange(0, 2)
-        enemy.speed_x = random.randrange(-1, 2)
-        
-        # 确保敌机可见
-        enemy.image.set_alpha(255)
+        enemy.speed_y = enemy.base_speed_y + int(rsy * 2)
+        enemy.speed_x = -1 + int(rsx * 3)
         
         return enemy
+    
+    def _cleanup_object(self, enemy: Enemy):
+        """回收敌机：池内对象都是精灵，直接从所有组中移除"""
+        enemy.kill()
+
+
+class ExplosionPool(ObjectPool):
+    """爆炸效果对象池
+    
+    预先创建固定数量的爆炸效果并循环复用，击毁敌机时不再分配新的
+    Surface或重新加载动画帧；池满时复用最早播放的爆炸效果
+    """
+    
+    def __init__(self, initial_size: int = 32, max_size: int = 32):
+        """初始化爆炸效果对象池"""
+        super().__init__(initial_size, max_size)
+    
+    def _create_object(self) -> Explosion:
+        """创建新的爆炸效果对象"""
+        explosion = Explosion((0, 0))
+        explosion.pool = self
+        return explosion
+    
+    def _reset_object(self, explosion: Explosion, center) -> Explosion:
+        """
+        重置爆炸效果的状态
+        
+        Args:
+            explosion: 要重置的爆炸效果对象
+            center: 爆炸中心位置
+        
+        Returns:
+            重置后的爆炸效果对象
+        """
+        explosion.reset(center)
+        return explosion
+    
+    def _cleanup_object(self, explosion: Explosion):
+        """回收爆炸效果：池内对象都是精灵，直接从所有组中移除"""
+        explosion.kill()
+    
+    def get_object(self, center) -> Optional[Explosion]:
+        """
+        获取一个爆炸效果对象，池满时复用最早的爆炸效果
+        
+        Args:
+            center: 爆炸中心位置
+        
+        Returns:
+            爆炸效果对象
+        """
+        explosion = super().get_object(center)
+        if explosion is None and self.active_objects:
+            explosion = next(iter(self.active_objects))
+            del self.active_objects[explosion]
+            self._cleanup_object(explosion)
+            explosion = self._reset_object(explosion, center)
+            self.active_objects[explosion] = None
+        return explosion
 
 
 class PoolManager:
@@ -228,6 +300,7 @@ class PoolManager:
         """初始化池管理器"""
         self.bullet_pool = BulletPool()
         self.enemy_pool = EnemyPool()
+        self.explosion_pool = ExplosionPool()
     
     def get_bullet(self, x: int, y: int) -> Optional[Bullet]:
         """
@@ -254,6 +327,18 @@ class PoolManager:
         """
         return self.enemy_pool.get_object(enemy_type)
     
+    def get_explosion(self, center) -> Optional[Explosion]:
+        """
+        获取一个爆炸效果对象
+        
+        Args:
+            center: 爆炸中心位置
+        
+        Returns:
+            爆炸效果对象
+        """
+        return self.explosion_pool.get_object(center)
+    
     def return_bullet(self, bullet: Bullet):
         """返回子弹到对象池"""
         self.bullet_pool.return_object(bullet)
@@ -262,14 +347,20 @@ class PoolManager:
         """返回敌机到对象池"""
         self.enemy_pool.return_object(enemy)
     
+    def return_explosion(self, explosion: Explosion):
+        """返回爆炸效果到对象池"""
+        self.explosion_pool.return_object(explosion)
+    
     def get_all_stats(self) -> dict:
         """获取所有对象池的统计信息"""
         return {
             'bullet_pool': self.bullet_pool.get_pool_stats(),
-            'enemy_pool': self.enemy_pool.get_pool_stats()
+            'enemy_pool': self.enemy_pool.get_pool_stats(),
+            'explosion_pool': self.explosion_pool.get_pool_stats()
         }
     
     def clear_all_pools(self):
         """清空所有对象池"""
         self.bullet_pool.clear_pool()
-        self.enemy_pool.clear_pool()
\ No newline at end of file
+        self.enemy_pool.clear_pool()
+        self.explosion_pool.clear_pool()
\ No newline at end of file
@@ -6,11 +6,274 @@
 """
 
 import pygame
-from typing import Dict, List, Tuple, Set
+import numpy as np
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Collection, Dict, List, Tuple, Set, Iterable, Optional, Sequence
 from config import SCREEN_WIDTH, SCREEN_HEIGHT
+from collision_kernels import pack_swar, rect_cells_packed, hash_pairs, collide_frame, NUMBA_AVAILABLE
+from entity_pool import EntityPool, get_entity_pool
+
+def rect_bounds(sprites: List[pygame.sprite.Sprite]) -> np.ndarray:
+    """把精灵的Rect读成形状为(N, 4)的int32数组，每行为 (x0, y0, x1, y1)
+    
+    Args:
+        sprites: 精灵列表
+        
+    Returns:
+        边界框数组
+    """
+    return np.fromiter(
+        (v for s in sprites for v in (s.rect.x, s.rect.y, s.rect.right, s.rect.bottom)),
+        dtype=np.int32, count=len(sprites) * 4).reshape(-1, 4)
+
+def kill_sprites(sprites: Collection[pygame.sprite.Sprite]):
+    """把一批精灵从它们所属的所有组中移除，每个组只调用一次remove
+    
+    Args:
+        sprites: 要移除的精灵集合（元素不重复）
+    """
+    if not sprites:
+        return
+    groups = {group for sprite in sprites for group in sprite.groups()}
+    for group in groups:
+        group.remove(*sprites)
+
+class SpriteSoA:
+    """精灵组的SoA（Structure of Arrays）边界框视图
+    
+    游戏逻辑仍然使用AoS形式的精灵对象，碰撞检测只读取这里连续存放的
+    int32数组。数组只在成员增删后才重建，未变化时直接复用，
+    避免每次检测都重新遍历精灵组并分配临时元组。
+    
+    若所有精灵都在实体位置池中持有槽位（slot_id），重建时只需按槽位
+    从位置池中整体取出边界框，不再逐个读取精灵的Rect。
+    """
+    
+    def __init__(self, sprites: Iterable[pygame.sprite.Sprite] = ()):
+        """初始化SoA视图
+        
+        Args:
+            sprites: 初始精灵集合（可以直接传入精灵组）
+        """
+        self.sprites: List[pygame.sprite.Sprite] = list(sprites)
+        self.slots: Optional[np.ndarray] = None  # 实体位置池槽位，成员不全有槽位时为None
+        self._rects = np.empty((0, 4), np.int32)
+        self._packed = np.empty(0, np.uint64)
+        self.version = 0  # 每次重建数组时递增
+        self._members_dirty = True
+        self._dirty = True
+    
+    def __len__(self) -> int:
+        return len(self.sprites)
+    
+    def add(self, *sprites: pygame.sprite.Sprite):
+        """添加精灵"""
+        self.sprites.extend(sprites)
+        self._members_dirty = True
+        self._dirty = True
+    
+    def remove(self, *sprites: pygame.sprite.Sprite):
+        """移除精灵"""
+        for sprite in sprites:
+            self.sprites.remove(sprite)
+        self._members_dirty = True
+        self._dirty = True
+    
+    @property
+    def rects(self) -> np.ndarray:
+        """形状为(N, 4)的int32边界框数组，每行为 (x0, y0, x1, y1)"""
+        if self._dirty:
+            self._rebuild()
+        return self._rects
+    
+    @property
+    def packed(self) -> np.ndarray:
+        """SWAR格式的uint64边界框数组，每个元素用4个16位通道存放一个矩形
+        
+        供 collision_kernels.aabb_pairs_swar 使用，读取带宽只有int32数组的一半。
+        """
+        if self._dirty:
+            self._rebuild()
+        return self._packed
+    
+    def _rebuild(self):
+        """根据当前精灵重建槽位数组和边界框数组"""
+        n = len(self.sprites)
+        if self._members_dirty:
+            if all(hasattr(s, 'slot_id') for s in self.sprites):
+                self.slots = np.fromiter((s.slot_id for s in self.sprites), dtype=np.intp, count=n)
+            else:
+                self.slots = None
+            self._members_dirty = False
+        if self.slots is not None:
+            self._rects = get_entity_pool().gather(self.slots)
+        else:
+            self._rects = rect_bounds(self.sprites)
+        self._packed = pack_swar(self._rects)
+        self.version += 1
+        self._dirty = False
+
+class FastGroup(pygame.sprite.Group):
+    """面向碰撞检测的精灵组
+    
+    在pygame.sprite.Group的基础上额外维护一个稠密精灵列表、精灵到列表下标的
+    映射，以及与之平行的实体位置池槽位数组。移除时与末尾元素交换，
+    保持列表连续，碰撞检测可以直接按槽位读取边界框并用整数下标回查精灵；
+    其余功能仍沿用Group的实现。
+    
+    组内精灵必须持有实体位置池槽位（slot_id）。
+    """
+    
+    def __init__(self, *sprites, capacity: int = 256):
+        """初始化精灵组
+        
+        Args:
+            sprites: 初始精灵
+            capacity: 槽位数组的初始容量，满时按2倍扩容
+        """
+        self._dense: List[pygame.sprite.Sprite] = []
+        self._slot: Dict[pygame.sprite.Sprite, int] = {}
+        self._slot_ids = np.empty(max(1, capacity), np.intp)
+        super().__init__(*sprites)
+    
+    def add_internal(self, sprite, layer=None):
+        """加入精灵时同步追加到稠密列表"""
+        super().add_internal(sprite, layer)
+        if sprite in self._slot:
+            return
+        n = len(self._dense)
+        if n == len(self._slot_ids):
+            grown = np.empty(n * 2, np.intp)
+            grown[:n] = self._slot_ids
+            self._slot_ids = grown
+        self._slot_ids[n] = sprite.slot_id
+        self._slot[sprite] = n
+        self._dense.append(sprite)
+    
+    def remove_internal(self, sprite):
+        """移除精灵时用末尾元素填补空位"""
+        super().remove_internal(sprite)
+        index = self._slot.pop(sprite)
+        last = self._dense.pop()
+        if last is not sprite:
+            self._dense[index] = last
+            self._slot[last] = index
+            self._slot_ids[index] = self._slot_ids[len(self._dense)]
+    
+    @property
+    def dense(self) -> List[pygame.sprite.Sprite]:
+        """稠密精灵列表，下标与 slot_ids 的元素一一对应"""
+        return self._dense
+    
+    @property
+    def slot_ids(self) -> np.ndarray:
+        """组内精灵的实体位置池槽位数组"""
+        return self._slot_ids[:len(self._dense)]
+
+
+class SortedEnemies(FastGroup):
+    """按 rect.top 排序的敌机组
+    
+    射击游戏中子弹沿竖直方向飞行，敌机以相近的速度下落，每帧之间的纵向顺序
+    几乎不变。组内稠密列表每帧用插入排序按 rect.top 重排一次（接近有序时为
+    O(n)），查询时用二分查找只截取纵向范围可能相交的一段敌机，代替逐个比较。
+    """
+    
+    def __init__(self, *sprites, capacity: int = 256):
+        """初始化敌机组
+        
+        Args:
+            sprites: 初始敌机
+            capacity: 槽位数组的初始容量
+        """
+        self._tops: List[int] = []
+        self._rects: List[pygame.Rect] = []
+        self._max_height = 0
+        self._sorted = False
+        super().__init__(*sprites, capacity=capacity)
+    
+    def add_internal(self, sprite, layer=None):
+        """加入敌机后需要重新排序"""
+        super().add_internal(sprite, layer)
+        self._sorted = False
+    
+    def remove_internal(self, sprite):
+        """移除敌机时末尾元素会被换到空位，需要重新排序"""
+        super().remove_internal(sprite)
+        self._sorted = False
+    
+    @property
+    def rects(self) -> List[pygame.Rect]:
+        """上次排序时按顺序收集的敌机矩形列表"""
+        return self._rects
+    
+    @property
+    def is_sorted(self) -> bool:
+        """自上次排序以来成员是否未发生变化"""
+        return self._sorted
+    
+    def sort_by_top(self):
+        """按当前 rect.top 对稠密列表做插入排序，并刷新二分查找用的键"""
+        dense = self._dense
+        slot = self._slot
+        slot_ids = self._slot_ids
+        tops = [sprite.rect.top for sprite in dense]
+        for i in range(1, len(dense)):
+            key = tops[i]
+            j = i - 1
+            if tops[j] <= key:
+                continue
+            sprite = dense[i]
+            slot_id = slot_ids[i]
+            while j >= 0 and tops[j] > key:
+                tops[j + 1] = tops[j]
+                dense[j + 1] = dense[j]
+                slot_ids[j + 1] = slot_ids[j]
+                slot[dense[j + 1]] = j + 1
+                j -= 1
+            tops[j + 1] = key
+            dense[j + 1] = sprite
+            slot_ids[j + 1] = slot_id
+            slot[sprite] = j + 1
+        
+        self._tops = tops
+        self._rects = [sprite.rect for sprite in dense]
+        self._max_height = max((rect.height for rect in self._rects), default=0)
+        self._sorted = True
+    
+    def first_collision(self, rect: pygame.Rect) -> int:
+        """查找与矩形相交的第一个敌机
+        
+        只在 rect.top - max_height < enemy.top < rect.bottom 的范围内调用
+        Rect.collidelist，调用前必须先 sort_by_top()。
+        
+        Args:
+            rect: 查询矩形
+            
+        Returns:
+            相交敌机在稠密列表中的下标，没有相交时返回-1
+        """
+        tops = self._tops
+        lo = bisect_left(tops, rect.top - self._max_height + 1)
+        hi = bisect_left(tops, rect.bottom, lo)
+        if lo == hi:
+            return -1
+        j = rect.collidelist(self._rects[lo:hi])
+        return j + lo if j >= 0 else -1
+
 
 class SpatialHash:
-    """空间哈希表，用于快速碰撞检测"""
+    """空间哈希表，用于快速碰撞检测
+    
+    网格中存放精灵在 sprites 列表中的下标，bounds 按同样的下标给出
+    (x0, y0, x1, y1) 边界框数组，窄检测可以一次性向量化比较所有候选对。
+    
+    网格采用CSR布局：所有精灵下标按网格单元排序后存放在一个扁平列表中，
+    hash_table 只记录每个非空单元在列表中的 (起始, 结束) 偏移。插入只登记精灵，
+    表在第一次查询时一次性构建，不再为每个单元分配列表。
+    """
     
     def __init__(self, cell_size: int = 64):
         """初始化空间哈希表
@@ -19,32 +282,134 @@ class SpatialHash:
             cell_size: 网格单元大小，默认64像素
         """
         self.cell_size = cell_size
-        self.hash_table: Dict[Tuple[int, int], List[pygame.sprite.Sprite]] = {}
+        self._shift = self._shift_for(cell_size)
+        self.sprites: List[pygame.sprite.Sprite] = []
+        self._bounds = np.empty((0, 4), np.int32)
+        self._bounds_dirty = False
+        self._cell_spans: Dict[int, Tuple[int, int]] = {}
+        self._cell_items: List[int] = []
+        # 同一张表的数组形式，供编译内核批量查询
+        self._cell_arrays: Tuple[np.ndarray, ...] = ()
+        self._rects: List[pygame.Rect] = []
+        self._cells_dirty = False
+        # 多网格查询的去重标记：_seen[i] 等于本次查询的代数表示下标i已收集
+        self._seen: List[int] = []
+        self._query_gen = 0
+        # 当前表内容对应的 (组id, 组大小, 代数)，为None表示需要重建
+        self._built_for: Optional[Tuple[int, int, int]] = None
         
     def clear(self):
         """清空哈希表"""
-        self.hash_table.clear()
+        self.sprites.clear()
+        self._bounds_dirty = True
+        self._cells_dirty = True
+        self._built_for = None
     
-    def _get_cells(self, rect: pygame.Rect) -> List[Tuple[int, int]]:
-        """获取矩形覆盖的所有网格单元
+    def invalidate(self):
+        """标记哈希表已过期，下一次rebuild_for必定重建"""
+        self._built_for = None
+    
+    @staticmethod
+    def _shift_for(cell_size: int) -> Optional[int]:
+        """网格大小为2的幂时返回对应的移位数，否则返回None"""
+        if cell_size & (cell_size - 1) == 0:
+            return cell_size.bit_length() - 1
+        return None
+    
+    def set_cell_size(self, cell_size: int):
+        """修改网格大小，大小变化时哈希表随之过期
         
         Args:
-            rect: 精灵的矩形区域
+            cell_size: 新的网格大小
+        """
+        if cell_size != self.cell_size:
+            self.cell_size = cell_size
+            self._shift = self._shift_for(cell_size)
+            self._cells_dirty = True
+            self._built_for = None
+    
+    def rebuild_for(self, group: pygame.sprite.Group, generation: int) -> bool:
+        """按需为精灵组重建哈希表
+        
+        同一帧内对同一个组的多次查询共用一张表，只有组、组大小或代数
+        变化时才清空并重新插入所有精灵
+        
+        Args:
+            group: 要插入哈希表的精灵组
+            generation: 精灵位置的代数，精灵移动后由调用方递增
             
         Returns:
-            覆盖的网格单元坐标列表
+            是否进行了重建
         """
-        cells = []
-        start_x = max(0, rect.left // self.cell_size)
-        end_x = min(SCREEN_WIDTH // self.cell_size, rect.right // self.cell_size)
-        start_y = max(0, rect.top // self.cell_size)
-        end_y = min(SCREEN_HEIGHT // self.cell_size, rect.bottom // self.cell_size)
+        key = (id(group), len(group), generation)
+        if key == self._built_for:
+            return False
+        self.clear()
+        self.sprites.extend(group)
+        self._built_for = key
+        return True
+    
+    @property
+    def bounds(self) -> np.ndarray:
+        """形状为(N, 4)的int32边界框数组，第i行对应 sprites[i]"""
+        if self._bounds_dirty:
+            self._bounds = rect_bounds(self.sprites)
+            self._bounds_dirty = False
+        return self._bounds
+    
+    @property
+    def rects(self) -> List[pygame.Rect]:
+        """精灵的Rect列表，第i项对应 sprites[i]"""
+        if self._cells_dirty:
+            self._build_cells()
+        return self._rects
+    
+    @property
+    def hash_table(self) -> Dict[int, Tuple[int, int]]:
+        """非空网格单元到其下标在扁平列表中 (起始, 结束) 偏移的映射"""
+        if self._cells_dirty:
+            self._build_cells()
+        return self._cell_spans
+    
+    def _build_cells(self):
+        """一次性展开所有精灵覆盖的网格单元，按单元排序后建立偏移表"""
+        sprite_idx, cells = rect_cells_packed(self.bounds, self.cell_size)
+        order = np.argsort(cells, kind='stable')
+        cells = cells[order]
+        unique_cells, starts = np.unique(cells, return_index=True)
+        ends = np.append(starts[1:], len(cells))
+        items = sprite_idx[order]
+        self._cell_arrays = (unique_cells, starts, ends, items)
+        self._cell_items = items.tolist()
+        self._cell_spans = dict(zip(unique_cells.tolist(), zip(starts.tolist(), ends.tolist())))
+        self._rects = [sprite.rect for sprite in self.sprites]
+        self._seen = [0] * len(self.sprites)
+        self._query_gen = 0
+        self._cells_dirty = False
+    
+    def _get_cells(self, rect: pygame.Rect) -> Sequence[int]:
+        """获取矩形覆盖的所有网格单元
         
-        for x in range(start_x, end_x + 1):
-            for y in range(start_y, end_y + 1):
-                cells.append((x, y))
+        屏幕外的精灵落在屏幕外的网格上，不会与屏幕内的精灵共享网格，无需裁剪
         
-        return cells
+        Args:
+            rect: 精灵的矩形区域
+            
+        Returns:
+            覆盖的网格单元序列，每个单元打包为整数 (cx << 16) | (cy & 0xFFFF)
+        """
+        shift = self._shift
+        if shift is not None:
+            sx, ex = rect.left >> shift, rect.right >> shift
+            sy, ey = rect.top >> shift, rect.bottom >> shift
+        else:
+            cell_size = self.cell_size
+            sx, ex = rect.left // cell_size, rect.right // cell_size
+            sy, ey = rect.top // cell_size, rect.bottom // cell_size
+        # 小精灵通常只落在一个网格内，直接返回元组
+        if sx == ex and sy == ey:
+            return ((sx << 16) | (sy & 0xFFFF),)
+        return [(cx << 16) | (cy & 0xFFFF) for cx in range(sx, ex + 1) for cy in range(sy, ey + 1)]
     
     def insert(self, sprite: pygame.sprite.Sprite):
         """将精灵插入到哈希表中
@@ -52,11 +417,54 @@ class SpatialHash:
         Args:
             sprite: 要插入的精灵
         """
-        cells = self._get_cells(sprite.rect)
+        self.sprites.append(sprite)
+        self._bounds_dirty = True
+        self._cells_dirty = True
+    
+    def query_indices(self, rect: pygame.Rect) -> Sequence[int]:
+        """查询与矩形可能碰撞的精灵下标
+        
+        矩形只落在一个网格时直接返回该网格的下标；跨多个网格时按查询代数
+        标记已收集的下标去重，不构建集合
+        
+        Args:
+            rect: 查询的矩形
+            
+        Returns:
+            可能碰撞的精灵在 sprites 中的下标序列，不含重复
+        """
+        spans = self.hash_table
+        items = self._cell_items
+        cells = self._get_cells(rect)
+        if len(cells) == 1:
+            span = spans.get(cells[0])
+            return items[span[0]:span[1]] if span is not None else ()
+        
+        self._query_gen += 1
+        gen = self._query_gen
+        seen = self._seen
+        candidates = []
         for cell in cells:
-            if cell not in self.hash_table:
-                self.hash_table[cell] = []
-            self.hash_table[cell].append(sprite)
+            span = spans.get(cell)
+            if span is not None:
+                for i in items[span[0]:span[1]]:
+                    if seen[i] != gen:
+                        seen[i] = gen
+                        candidates.append(i)
+        return candidates
+    
+    def query_pairs(self, bounds: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """在编译内核中一次查询一批矩形，并直接完成AABB比较
+        
+        Args:
+            bounds: 查询矩形，形状为(N, 4)的int32数组，每行为 (x0, y0, x1, y1)
+            
+        Returns:
+            (i_idx, j_idx) 相交的 (查询下标, sprites下标)，按查询下标升序
+        """
+        if self._cells_dirty:
+            self._build_cells()
+        return hash_pairs(bounds, self.bounds, self.cell_size, *self._cell_arrays)
     
     def query(self, sprite: pygame.sprite.Sprite) -> Set[pygame.sprite.Sprite]:
         """查询与指定精灵可能碰撞的精灵
@@ -67,19 +475,142 @@ class SpatialHash:
         Returns:
             可能碰撞的精灵集合
         """
-        candidates = set()
-        cells = self._get_cells(sprite.rect)
-        
-        for cell in cells:
-            if cell in self.hash_table:
-                candidates.update(self.hash_table[cell])
+        sprites = self.sprites
+        candidates = {sprites[i] for i in self.query_indices(sprite.rect)}
         
         # 移除自己
         candidates.discard(sprite)
         return candidates
 
+class Quadtree:
+    """四叉树，递归细分屏幕区域以剪枝碰撞检测的候选对"""
+    
+    def __init__(self, level: int = 0, bounds: Tuple[int, int, int, int] = (0, 0, SCREEN_WIDTH, SCREEN_HEIGHT),
+                 max_objects: int = 4, max_levels: int = 4):
+        """初始化四叉树节点
+        
+        Args:
+            level: 节点深度，根节点为0
+            bounds: 节点覆盖的区域 (x, y, width, height)
+            max_objects: 节点分裂前可容纳的最大对象数
+            max_levels: 最大深度
+        """
+        self.level = level
+        self.bounds = pygame.Rect(bounds)
+        self.max_objects = max_objects
+        self.max_levels = max_levels
+        self.objects: List[Tuple[pygame.Rect, pygame.sprite.Sprite]] = []
+        self.nodes: List['Quadtree'] = []
+    
+    def clear(self):
+        """清空四叉树"""
+        self.objects.clear()
+        for node in self.nodes:
+            node.clear()
+        self.nodes.clear()
+    
+    def _split(self):
+        """将当前节点分裂为四个子节点"""
+        x, y = self.bounds.x, self.bounds.y
+        half_w = self.bounds.width // 2
+        half_h = self.bounds.height // 2
+        level = self.level + 1
+        
+        self.nodes = [
+            Quadtree(level, (x + half_w, y, self.bounds.width - half_w, half_h), self.max_objects, self.max_levels),
+            Quadtree(level, (x, y, half_w, half_h), self.max_objects, self.max_levels),
+            Quadtree(level, (x, y + half_h, half_w, self.bounds.height - half_h), self.max_objects, self.max_levels),
+            Quadtree(level, (x + half_w, y + half_h, self.bounds.width - half_w, self.bounds.height - half_h),
+                     self.max_objects, self.max_levels),
+        ]
+    
+    def _get_index(self, rect: pygame.Rect) -> int:
+        """获取矩形完全落入的子节点索引
+        
+        Args:
+            rect: 要定位的矩形
+            
+        Returns:
+            子节点索引（0右上、1左上、2左下、3右下），跨越多个子节点时返回-1
+        """
+        mid_x = self.bounds.x + self.bounds.width // 2
+        mid_y = self.bounds.y + self.bounds.height // 2
+        
+        top = rect.top >= self.bounds.top and rect.bottom <= mid_y
+        bottom = rect.top >= mid_y and rect.bottom <= self.bounds.bottom
+        left = rect.left >= self.bounds.left and rect.right <= mid_x
+        right = rect.left >= mid_x and rect.right <= self.bounds.right
+        
+        if top:
+            if right:
+                return 0
+            if left:
+                return 1
+        elif bottom:
+            if left:
+                return 2
+            if right:
+                return 3
+        return -1
+    
+    def insert(self, sprite: pygame.sprite.Sprite):
+        """将精灵插入四叉树
+        
+        Args:
+            sprite: 要插入的精灵
+        """
+        rect = sprite.rect
+        if self.nodes:
+            index = self._get_index(rect)
+            if index != -1:
+                self.nodes[index].insert(sprite)
+                return
+        
+        self.objects.append((rect, sprite))
+        
+        # 超出容量时分裂，并把能完全放入子节点的对象下移
+        if len(self.objects) > self.max_objects and self.level < self.max_levels:
+            if not self.nodes:
+                self._split()
+            remaining = []
+            for obj_rect, obj in self.objects:
+                index = self._get_index(obj_rect)
+                if index != -1:
+                    self.nodes[index].insert(obj)
+                else:
+                    remaining.append((obj_rect, obj))
+            self.objects = remaining
+    
+    def retrieve(self, rect: pygame.Rect) -> List[pygame.sprite.Sprite]:
+        """获取可能与指定矩形碰撞的精灵
+        
+        Args:
+            rect: 查询的矩形
+            
+        Returns:
+            候选精灵列表
+        """
+        candidates = [obj for _, obj in self.objects]
+        if self.nodes:
+            index = self._get_index(rect)
+            if index != -1:
+                candidates.extend(self.nodes[index].retrieve(rect))
+            else:
+                # 跨越多个子节点时，查询所有与之相交的子节点
+                for node in self.nodes:
+                    if node.bounds.colliderect(rect):
+                        candidates.extend(node.retrieve(rect))
+        return candidates
+
+# 缓存未命中的哨兵值，与缓存的False结果区分
+_MISS = object()
+
 class CollisionCache:
-    """碰撞检测缓存系统"""
+    """碰撞检测缓存系统
+    
+    使用OrderedDict实现LRU：命中时move_to_end、淘汰时popitem(last=False)，
+    都是O(1)操作。
+    """
     
     def __init__(self, max_size: int = 1000):
         """初始化缓存
@@ -87,9 +618,8 @@ class CollisionCache:
         Args:
             max_size: 缓存最大大小
         """
-        self.cache: Dict[Tuple[int, int], bool] = {}
+        self.cache: "OrderedDict[Tuple, bool]" = OrderedDict()  # 按访问顺序排列，最久未使用的在最前
         self.max_size = max_size
-        self.access_order = []  # LRU缓存访问顺序
     
     def _get_cache_key(self, sprite1: pygame.sprite.Sprite, sprite2: pygame.sprite.Sprite) -> Tuple[int, int]:
         """生成缓存键
@@ -100,16 +630,12 @@ class CollisionCache:
         Returns:
             缓存键
         """
-        # 使用精灵的ID和位置生成键
+        # 只使用精灵的ID生成键，缓存结果可以跨帧复用；
+        # 因此缓存只适用于不会移动的静态精灵
         id1, id2 = id(sprite1), id(sprite2)
         if id1 > id2:
             id1, id2 = id2, id1
-        
-        # 包含位置信息以确保缓存有效性
-        pos1 = (sprite1.rect.x, sprite1.rect.y)
-        pos2 = (sprite2.rect.x, sprite2.rect.y)
-        
-        return (id1, id2, pos1, pos2)
+        return (id1, id2)
     
     def get(self, sprite1: pygame.sprite.Sprite, sprite2: pygame.sprite.Sprite) -> bool:
         """从缓存获取碰撞结果
@@ -121,12 +647,12 @@ class CollisionCache:
             碰撞结果，如果缓存中没有则返回None
         """
         key = self._get_cache_key(sprite1, sprite2)
-        if key in self.cache:
-            # 更新访问顺序
-            self.access_order.remove(key)
-            self.access_order.append(key)
-            return self.cache[key]
-        return None
+        result = self.cache.get(key, _MISS)
+        if result is _MISS:
+            return None
+        # 更新访问顺序
+        self.cache.move_to_end(key)
+        return result
     
     def put(self, sprite1: pygame.sprite.Sprite, sprite2: pygame.sprite.Sprite, result: bool):
         """将碰撞结果放入缓存
@@ -136,130 +662,242 @@ class CollisionCache:
             result: 碰撞结果
         """
         key = self._get_cache_key(sprite1, sprite2)
+        self.cache[key] = result
+        self.cache.move_to_end(key)
         
         # 如果缓存已满，移除最久未使用的项
-        if len(self.cache) >= self.max_size and key not in self.cache:
-            oldest_key = self.access_order.pop(0)
-            del self.cache[oldest_key]
-        
-        self.cache[key] = result
-        if key in self.access_order:
-            self.access_order.remove(key)
-        self.access_order.append(key)
+        if len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
     
     def clear(self):
         """清空缓存"""
         self.cache.clear()
-        self.access_order.clear()
+
+# 组规模低于以下阈值时构建空间哈希表的开销超过它省下的矩形比较，直接逐对检测
+GRID_MIN_PAIRS = 256    # group1大小×group2大小
+GRID_MIN_GROUP = 32     # 被插入哈希表的组的大小
+# 自适应网格大小的下限，网格边长取精灵尺寸的两倍，使每个网格约容纳1~4个精灵
+MIN_CELL_SIZE = 32
+
+# 只可能在两个精灵的Rect相交时返回真值的碰撞函数，可以先用矩形检测提前排除；
+# collide_circle、collide_rect_ratio等可能在Rect之外判定相交，不在此列
+RECT_BOUNDED_COLLIDERS = frozenset((pygame.sprite.collide_rect, pygame.sprite.collide_mask))
+
+@dataclass
+class CollisionStats:
+    """碰撞检测器的性能统计，计数器用普通属性存放，更新时不经过字典哈希"""
+    total_checks: int = 0
+    cache_hits: int = 0
+    actual_collisions: int = 0
+    spatial_hash_queries: int = 0
 
 class OptimizedCollisionDetector:
     """优化的碰撞检测器"""
     
-    def __init__(self, cell_size: int = 64, use_cache: bool = True):
+    def __init__(self, cell_size: int = 64, use_cache: bool = False):
         """初始化碰撞检测器
         
         Args:
             cell_size: 空间哈希网格大小
-            use_cache: 是否使用缓存
+            use_cache: 是否使用缓存；缓存按精灵ID记录结果，只对静态精灵组有效，
+                游戏中的子弹和敌机每帧移动，默认关闭
         """
         self.spatial_hash = SpatialHash(cell_size)
         self.use_cache = use_cache
         self.cache = CollisionCache() if use_cache else None
+        # 精灵位置的代数，每帧由new_frame递增，空间哈希表据此判断是否需要重建
+        self.generation = 0
         
         # 性能统计
-        self.stats = {
-            'total_checks': 0,
-            'cache_hits': 0,
-            'actual_collisions': 0,
-            'spatial_hash_queries': 0
-        }
+        self.stats = CollisionStats()
     
     def reset_stats(self):
         """重置性能统计"""
-        self.stats = {
-            'total_checks': 0,
-            'cache_hits': 0,
-            'actual_collisions': 0,
-            'spatial_hash_queries': 0
-        }
+        self.stats = CollisionStats()
     
     def get_stats(self) -> Dict[str, int]:
         """获取性能统计信息"""
-        return self.stats.copy()
+        return asdict(self.stats)
+    
+    def _adapt_cell_size(self, group: pygame.sprite.Group):
+        """以组内第一个精灵的尺寸估计平均尺寸，把网格大小设为其两倍（取整到2的幂）
+        
+        Args:
+            group: 要插入哈希表的非空精灵组
+        """
+        rect = next(iter(group)).rect
+        size = max(MIN_CELL_SIZE, 2 * max(rect.width, rect.height))
+        # 向上取到2的幂，网格坐标可以用移位计算
+        self.spatial_hash.set_cell_size(1 << (size - 1).bit_length())
     
     def groupcollide_optimized(self, group1: pygame.sprite.Group, group2: pygame.sprite.Group, 
-                              dokill1: bool = False, dokill2: bool = False, collided=None) -> Dict[pygame.sprite.Sprite, List[pygame.sprite.Sprite]]:
+                              dokill1: bool = False, dokill2: bool = False, collided=None,
+                              dynamic: bool = True) -> Dict[pygame.sprite.Sprite, List[pygame.sprite.Sprite]]:
         """优化的组碰撞检测
         
         Args:
             group1, group2: 要检测碰撞的精灵组
             dokill1, dokill2: 是否在碰撞后移除精灵
             collided: 自定义碰撞检测函数
+            dynamic: 精灵是否会移动；为True时跳过缓存，直接做矩形检测
             
         Returns:
             碰撞结果字典
         """
-         # 清空并重建空间哈希表
-        self.spatial_hash.clear()
+        # 小规模的组直接逐对检测，不构建空间哈希表
+        n1, n2 = len(group1), len(group2)
+        if n1 * n2 < GRID_MIN_PAIRS or n2 < GRID_MIN_GROUP:
+            return pygame.sprite.groupcollide(group1, group2, dokill1, dokill2, collided)
         
-        # 将group2的精灵插入空间哈希表
-        for sprite in group2:
-            self.spatial_hash.insert(sprite)
+        # 将group2的精灵插入空间哈希表，本帧已为该组建好的表直接复用
+        self._adapt_cell_size(group2)
+        self.spatial_hash.rebuild_for(group2, self.generation)
         
         hits = {}
-        sprites_to_kill1 = []
-        sprites_to_kill2 = []
+        sprites_to_kill2: Set[pygame.sprite.Sprite] = set()
+        cache = self.cache if self.use_cache and not dynamic else None
+        
+        if collided is None and cache is None:
+            # 默认矩形检测：有Numba时整组交给编译内核，否则逐个精灵交给collidelistall
+            if NUMBA_AVAILABLE:
+                hit_pairs = self._kernel_hit_pairs(group1)
+            else:
+                hit_pairs = self._rect_hit_pairs(group1)
+        else:
+            hit_pairs = self._checked_hit_pairs(group1, collided, cache)
+        
+        for sprite1, sprite2 in hit_pairs:
+            self.stats.actual_collisions += 1
+            
+            if sprite1 not in hits:
+                hits[sprite1] = []
+            hits[sprite1].append(sprite2)
+            
+            # 标记要删除的精灵
+            if dokill2:
+                sprites_to_kill2.add(sprite2)
+        
+        # 删除标记的精灵；发生碰撞的group1精灵就是结果字典的键，无需逐对记录
+        if dokill1:
+            kill_sprites(hits.keys())
+        kill_sprites(sprites_to_kill2)
+        if sprites_to_kill2:
+            self.spatial_hash.invalidate()
+        
+        return hits
+    
+    def _rect_hits(self, rect: pygame.Rect) -> Sequence[int]:
+        """用空间哈希收集候选下标，再交给Rect.collidelistall在C扩展内逐个比较
         
-        # 对group1中的每个精灵进行碰撞检测
+        Args:
+            rect: 查询的矩形
+            
+        Returns:
+            与矩形相交的精灵在哈希表 sprites 中的下标
+        """
+        spatial_hash = self.spatial_hash
+        candidates = spatial_hash.query_indices(rect)
+        self.stats.total_checks += len(candidates)
+        if len(candidates) <= 1:
+            # 单个候选直接比较，省去构建列表
+            if candidates and not rect.colliderect(spatial_hash.rects[candidates[0]]):
+                return ()
+            return candidates
+        rects = spatial_hash.rects
+        return [candidates[k] for k in rect.collidelistall([rects[j] for j in candidates])]
+    
+    def _rect_hit_pairs(self, group1: Iterable[pygame.sprite.Sprite]) -> List[Tuple[pygame.sprite.Sprite, pygame.sprite.Sprite]]:
+        """对group1中的每个精灵做默认的矩形检测
+        
+        Args:
+            group1: 查询的精灵（组），被查询的组已插入空间哈希表
+            
+        Returns:
+            相交的 (group1精灵, 哈希表中的精灵) 列表
+        """
+        sprites2 = self.spatial_hash.sprites
+        rect_hits = self._rect_hits
+        pairs = []
+        queries = 0
+        for sprite1 in group1:
+            queries += 1
+            for j in rect_hits(sprite1.rect):
+                sprite2 = sprites2[j]
+                # 与query一致，同一精灵不与自己配对
+                if sprite2 is not sprite1:
+                    pairs.append((sprite1, sprite2))
+        self.stats.spatial_hash_queries += queries
+        return pairs
+    
+    def _kernel_hit_pairs(self, group1: Iterable[pygame.sprite.Sprite]) -> List[Tuple[pygame.sprite.Sprite, pygame.sprite.Sprite]]:
+        """把group1的边界框一次交给编译内核，完成网格查询、去重和矩形比较
+        
+        Args:
+            group1: 查询的精灵（组），被查询的组已插入空间哈希表
+            
+        Returns:
+            相交的 (group1精灵, 哈希表中的精灵) 列表
+        """
+        sprites1 = list(group1)
+        sprites2 = self.spatial_hash.sprites
+        i_idx, j_idx = self.spatial_hash.query_pairs(rect_bounds(sprites1))
+        self.stats.spatial_hash_queries += len(sprites1)
+        # 与query一致，同一精灵不与自己配对
+        return [(sprites1[i], sprites2[j]) for i, j in zip(i_idx.tolist(), j_idx.tolist())
+                if sprites1[i] is not sprites2[j]]
+    
+    def _checked_hit_pairs(self, group1: Iterable[pygame.sprite.Sprite], collided, cache: Optional['CollisionCache']):
+        """逐对检测候选精灵，支持自定义碰撞函数和结果缓存
+        
+        Args:
+            group1: 查询的精灵（组），被查询的组已插入空间哈希表
+            collided: 自定义碰撞检测函数，为None时使用rect检测
+            cache: 碰撞结果缓存，为None时不使用缓存
+            
+        Yields:
+            相交的 (group1精灵, 哈希表中的精灵)
+        """
+        stats = self.stats
+        query = self.spatial_hash.query
+        # 结果必然落在矩形之内的碰撞函数，先做矩形检测，不相交时不再调用
+        rect_gated = collided in RECT_BOUNDED_COLLIDERS
         for sprite1 in group1:
-            self.stats['spatial_hash_queries'] += 1
-            candidates = self.spatial_hash.query(sprite1)
+            candidates = query(sprite1)
+            stats.spatial_hash_queries += 1
+            if not candidates:
+                continue
+            stats.total_checks += len(candidates)
+            # 外层精灵的Rect及其方法在内层循环外只查找一次
+            colliderect = sprite1.rect.colliderect
             
             for sprite2 in candidates:
-                self.stats['total_checks'] += 1
-                
                 # 尝试从缓存获取结果
                 collision_result = None
-                if self.use_cache and self.cache:
-                    collision_result = self.cache.get(sprite1, sprite2)
+                if cache is not None:
+                    collision_result = cache.get(sprite1, sprite2)
                     if collision_result is not None:
-                        self.stats['cache_hits'] += 1
+                        stats.cache_hits += 1
                 
                 # 如果缓存中没有，进行实际碰撞检测
                 if collision_result is None:
                     # 使用自定义碰撞检测函数或默认rect检测
-                    if collided is not None:
-                        collision_result = collided(sprite1, sprite2)
+                    if collided is None:
+                        collision_result = colliderect(sprite2.rect)
+                    elif rect_gated and not colliderect(sprite2.rect):
+                        collision_result = False
                     else:
-                        collision_result = sprite1.rect.colliderect(sprite2.rect)
+                        collision_result = collided(sprite1, sprite2)
                     
                     # 将结果放入缓存
-                    if self.use_cache and self.cache:
-                        self.cache.put(sprite1, sprite2, collision_result)
+                    if cache is not None:
+                        cache.put(sprite1, sprite2, collision_result)
                 
                 if collision_result:
-                    self.stats['actual_collisions'] += 1
-                    
-                    if sprite1 not in hits:
-                        hits[sprite1] = []
-                    hits[sprite1].append(sprite2)
-                    
-                    # 标记要删除的精灵
-                    if dokill1 and sprite1 not in sprites_to_kill1:
-                        sprites_to_kill1.append(sprite1)
-                    if dokill2 and sprite2 not in sprites_to_kill2:
-                        sprites_to_kill2.append(sprite2)
-        
-        # 删除标记的精灵
-        for sprite in sprites_to_kill1:
-            sprite.kill()
-        for sprite in sprites_to_kill2:
-            sprite.kill()
-        
-        return hits
+                    yield sprite1, sprite2
     
     def spritecollide_optimized(self, sprite: pygame.sprite.Sprite, group: pygame.sprite.Group, 
-                               dokill: bool = False, collided=None) -> List[pygame.sprite.Sprite]:
+                               dokill: bool = False, collided=None,
+                               dynamic: bool = True) -> List[pygame.sprite.Sprite]:
         """优化的精灵碰撞检测
         
         Args:
@@ -267,56 +905,43 @@ class OptimizedCollisionDetector:
             group: 精灵组
             dokill: 是否在碰撞后移除精灵
             collided: 自定义碰撞检测函数
+            dynamic: 精灵是否会移动；为True时跳过缓存，直接做矩形检测
             
         Returns:
             碰撞的精灵列表
         """
-         # 重建空间哈希表
-        self.spatial_hash.clear()
-        for s in group:
-            self.spatial_hash.insert(s)
+        # 小规模的组直接逐个检测，不构建空间哈希表
+        if len(group) < GRID_MIN_GROUP:
+            return pygame.sprite.spritecollide(sprite, group, dokill, collided)
         
-        self.stats['spatial_hash_queries'] += 1
-        candidates = self.spatial_hash.query(sprite)
+        # 按需重建空间哈希表
+        self._adapt_cell_size(group)
+        self.spatial_hash.rebuild_for(group, self.generation)
         
-        collisions = []
-        sprites_to_kill = []
+        cache = self.cache if self.use_cache and not dynamic else None
+        if collided is None and cache is None:
+            hit_pairs = self._rect_hit_pairs((sprite,))
+        else:
+            hit_pairs = self._checked_hit_pairs((sprite,), collided, cache)
         
-        for candidate in candidates:
-            self.stats['total_checks'] += 1
-            
-            # 尝试从缓存获取结果
-            collision_result = None
-            if self.use_cache and self.cache:
-                collision_result = self.cache.get(sprite, candidate)
-                if collision_result is not None:
-                    self.stats['cache_hits'] += 1
-            
-            # 如果缓存中没有，进行实际碰撞检测
-            if collision_result is None:
-                # 使用自定义碰撞检测函数或默认rect检测
-                if collided is not None:
-                    collision_result = collided(sprite, candidate)
-                else:
-                    collision_result = sprite.rect.colliderect(candidate.rect)
-                
-                # 将结果放入缓存
-                if self.use_cache and self.cache:
-                    self.cache.put(sprite, candidate, collision_result)
-            
-            if collision_result:
-                self.stats['actual_collisions'] += 1
-                collisions.append(candidate)
-                
-                if dokill:
-                    sprites_to_kill.append(candidate)
+        collisions = [candidate for _, candidate in hit_pairs]
+        self.stats.actual_collisions += len(collisions)
+        sprites_to_kill: Set[pygame.sprite.Sprite] = set(collisions) if dokill else set()
         
         # 删除标记的精灵
-        for s in sprites_to_kill:
-            s.kill()
+        kill_sprites(sprites_to_kill)
+        if sprites_to_kill:
+            self.spatial_hash.invalidate()
         
         return collisions
     
+    def new_frame(self):
+        """精灵位置已更新，递增代数使空间哈希表在下一次查询时重建
+        
+        游戏循环在每帧移动精灵之后调用一次
+        """
+        self.generation += 1
+    
     def clear_cache(self):
         """清空缓存"""
         if self.cache:
@@ -333,12 +958,82 @@ def optimized_groupcollide(group1: pygame.sprite.Group, group2: pygame.sprite.Gr
                           dokill1: bool = False, dokill2: bool = False, collided=None) -> Dict[pygame.sprite.Sprite, List[pygame.sprite.Sprite]]:
     """优化的组碰撞检测函数（兼容pygame.sprite.groupcollide接口）
     支持自定义碰撞检测函数
+    
+    调用方不会通知精灵移动，每次调用都递增代数、按当前位置重建空间哈希表；
+    需要在一帧内复用哈希表时直接使用检测器并在移动精灵后调用new_frame()
     """
+    _global_collision_detector.new_frame()
     return _global_collision_detector.groupcollide_optimized(group1, group2, dokill1, dokill2, collided)
 
 def optimized_spritecollide(sprite: pygame.sprite.Sprite, group: pygame.sprite.Group, 
                            dokill: bool = False, collided=None) -> List[pygame.sprite.Sprite]:
     """优化的精灵碰撞检测函数（兼容pygame.sprite.spritecollide接口）
     支持自定义碰撞检测函数
+    
+    与optimized_groupcollide相同，每次调用都按当前位置重建空间哈希表
+    """
+    _global_collision_detector.new_frame()
+    return _global_collision_detector.spritecollide_optimized(sprite, group, dokill, collided)
+
+
+# 子弹数×敌机数低于该值时，逐个子弹调用Rect.collidelistall比调用碰撞内核更快
+# （NumPy回退实现的固定开销更大，阈值相应提高）
+FRAME_BRUTE_FORCE_PAIRS = 128 if NUMBA_AVAILABLE else 2048
+
+def detect_frame_collisions(pool: EntityPool, bullets: FastGroup, enemies: FastGroup,
+                            player_rect: Optional[pygame.Rect] = None) -> Tuple[Tuple[List[int], List[int]], List[int]]:
+    """一次扫描完成一帧内的子弹-敌机与玩家-敌机碰撞检测
+    
+    由 collision_kernels.collide_frame 直接按槽位读取实体位置池中的边界框，
+    一次调用同时得到子弹-敌机与玩家-敌机的碰撞结果，比较方式与
+    Rect.colliderect一致。子弹只能击中一个敌机，每颗子弹只报告第一个相交的
+    敌机，与spritecollideany相同，不再枚举全部相交对。候选对数量低于
+    FRAME_BRUTE_FORCE_PAIRS 时改用pygame的collidelist，省去内核调用的固定开销；
+    敌机组为已排序的 SortedEnemies 时再按纵坐标二分截取候选范围。
+    
+    Args:
+        pool: 实体位置池
+        bullets: 子弹组
+        enemies: 敌机组
+        player_rect: 玩家矩形，为None时不检测玩家碰撞
+        
+    Returns:
+        ((bullet_idx, enemy_idx), player_enemy_idx)：前者为发生碰撞的子弹及其
+        第一个相交敌机在各自稠密列表中的下标（按子弹下标升序，子弹不重复），
+        后者为与玩家碰撞的敌机下标
     """
-    return _global_collision_detector.spritecollide_optimized(sprite, group, dokill, collided)
\ No newline at end of file
+    nb = len(bullets.dense)
+    ne = len(enemies.dense)
+    if not ne or (not nb and player_rect is None):
+        return ([], []), []
+    
+    if nb * ne < FRAME_BRUTE_FORCE_PAIRS:
+        bullet_idx = []
+        enemy_idx = []
+        if isinstance(enemies, SortedEnemies) and enemies.is_sorted:
+            # 敌机已按纵坐标排序，只检查纵向范围内的一段
+            first_collision = enemies.first_collision
+            for i, bullet in enumerate(bullets.dense):
+                j = first_collision(bullet.rect)
+                if j >= 0:
+                    bullet_idx.append(i)
+                    enemy_idx.append(j)
+            enemy_rects = enemies.rects
+        else:
+            enemy_rects = [enemy.rect for enemy in enemies.dense]
+            for i, bullet in enumerate(bullets.dense):
+                j = bullet.rect.collidelist(enemy_rects)
+                if j >= 0:
+                    bullet_idx.append(i)
+                    enemy_idx.append(j)
+        player_idx = player_rect.collidelistall(enemy_rects) if player_rect is not None else []
+        return (bullet_idx, enemy_idx), player_idx
+    
+    if player_rect is not None:
+        i_idx, j_idx, p_idx = collide_frame(pool.positions, bullets.slot_ids, enemies.slot_ids,
+                                            player_rect.x, player_rect.y,
+                                            player_rect.right, player_rect.bottom, True)
+    else:
+        i_idx, j_idx, p_idx = collide_frame(pool.positions, bullets.slot_ids, enemies.slot_ids,
+                                            0, 0, 0, 0, False)
+    return (i_idx.tolist(), j_idx.tolist()), p_idx.tolist()
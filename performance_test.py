@@ -54,32 +54,39 @@ def test_without_object_pool(num_objects=1000, cycles=10):
     
     total_objects_created = 0
     
-    for cycle in range(cycles):
-        objects = []
-        
-        # 创建对象
-        for i in range(num_objects // 2):
-            bullet = Bullet(100, 100)
-            enemy = Enemy("normal")
-            objects.extend([bullet, enemy])
-            total_objects_created += 2
-        
-        monitor.add_objects(num_objects)
-        
-        # 模拟使用对象
-        for obj in objects:
-            if hasattr(obj, 'rect'):
-                obj.rect.x += 1
-        
-        # 销毁对象（模拟游戏中的对象销毁）
-        del objects
-        gc.collect()
-        
-        if cycle % 2 == 0:
-            monitor.print_stats(f"周期 {cycle + 1}/{cycles}")
+    # 测量期间关闭垃圾回收，计时只反映对象的创建和释放，结束后统一回收一次
+    gc.disable()
+    try:
+        for cycle in range(cycles):
+            objects = []
+            
+            # 创建对象
+            for i in range(num_objects // 2):
+                bullet = Bullet(100, 100)
+                enemy = Enemy("normal")
+                objects.extend([bullet, enemy])
+                total_objects_created += 2
+            
+            monitor.add_objects(num_objects)
+            
+            # 模拟使用对象
+            for obj in objects:
+                if hasattr(obj, 'rect'):
+                    obj.rect.x += 1
+            
+            # 销毁对象（模拟游戏中的对象销毁）
+            del objects
+            
+            if cycle % 2 == 0:
+                monitor.print_stats(f"周期 {cycle + 1}/{cycles}")
+    finally:
+        gc.enable()
     
     final_stats = monitor.get_current_stats()
-    print(f"\n总计创建对象: {total_objects_created}")
+    # 显示测量期间积累的分代计数，体现分配压力而不把回收时间计入耗时
+    print(f"\n回收前的垃圾回收分代计数: {gc.get_count()}")
+    gc.collect()
+    print(f"总计创建对象: {total_objects_created}")
     print(f"总耗时: {final_stats['elapsed_time']:.2f}s")
     print(f"平均每秒创建对象: {total_objects_created/final_stats['elapsed_time']:.0f} 个/秒")
     
@@ -3,12 +3,14 @@
 
 import pygame
 import os
+import numpy as np
 from game_logic import GAME_INIT, GAME_START, GAME_OVER, GAME_PAUSED
 from state_manager import GameState
 from config import (
     SCREEN_WIDTH, SCREEN_HEIGHT, WHITE, BLACK, RED, GREEN, BLUE,
     FONT_SIZE_LARGE, FONT_SIZE_MEDIUM, FONT_SIZE_SMALL
 )
+from sprites import blit_batch
 
 class Renderer:
     """渲染管理类，负责处理所有渲染相关功能"""
@@ -16,6 +18,16 @@ class Renderer:
     def __init__(self, screen):
         """初始化渲染器"""
         self.screen = screen
+        
+        # 静态文字的渲染结果缓存：(字体, 文本, 颜色) -> Surface
+        self._text_cache = {}
+        # 动态文字（分数、生命等）只保留最近一次的渲染结果：键 -> (文本, Surface)
+        self._label_cache = {}
+        # 静态文字及其定位矩形：(字体, 文本, 颜色, 锚点) -> (Surface, Rect)
+        self._placed_cache = {}
+        # 状态信息的半透明底板：尺寸 -> Surface
+        self._state_bg_cache = {}
+        
         self.load_resources()
     
     def load_resources(self):
@@ -40,32 +52,19 @@ class Renderer:
             'C:/Windows/Fonts/arial.ttf',       # Windows
         ]
         
-        font_path = None
-        for font in font_candidates:
-            if os.path.exists(font):
-                try:
-                    # 测试字体是否可以正常加载
-                    test_font = pygame.font.Font(font, 24)
-                    font_path = font
-                    print(f"成功找到字体: {font}")
-                    break
-                except Exception as e:
-                    print(f"字体加载失败 {font}: {e}")
-                    continue
-        
-        # 加载字体
-        if font_path:
+        # 直接按实际需要的字号加载字体，加载成功即说明字体可用，不再单独试载；
+        # 失败时换下一个候选
+        for font_path in font_candidates:
+            if not os.path.exists(font_path):
+                continue
             try:
-                self.font = pygame.font.Font(font_path, FONT_SIZE_MEDIUM)
-                self.font_large = pygame.font.Font(font_path, FONT_SIZE_LARGE)
-                self.font_medium = pygame.font.Font(font_path, FONT_SIZE_MEDIUM)
-                self.font_small = pygame.font.Font(font_path, FONT_SIZE_SMALL)
-                self.use_chinese = False  # 系统没有中文字体，使用英文
-                print(f"使用字体文件: {font_path}")
+                self._load_fonts(font_path)
             except Exception as e:
-                print(f"字体文件加载失败: {e}")
-                # 回退到默认字体
-                self._load_default_fonts()
+                print(f"字体加载失败 {font_path}: {e}")
+                continue
+            self.use_chinese = False  # 系统没有中文字体，使用英文
+            print(f"使用字体文件: {font_path}")
+            break
         else:
             # 使用pygame默认字体
             self._load_default_fonts()
@@ -79,13 +78,29 @@ class Renderer:
         
         # 加载背景图像
         self._load_background()
+        
+        # 预先生成开始/说明界面的渐变背景
+        self.start_bg = self._build_gradient_background()
+        
+        # 暂停界面的半透明覆盖层，逐像素alpha，只填充一次
+        self.pause_overlay = self._translucent_surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    
+    def _load_fonts(self, font_path):
+        """按大、中、小三种字号各加载一次字体，font与font_medium共用同一个对象
+        
+        Args:
+            font_path: 字体文件路径，为None时使用pygame默认字体
+        """
+        font_large = pygame.font.Font(font_path, FONT_SIZE_LARGE)
+        font_medium = pygame.font.Font(font_path, FONT_SIZE_MEDIUM)
+        font_small = pygame.font.Font(font_path, FONT_SIZE_SMALL)
+        self.font_large = font_large
+        self.font = self.font_medium = font_medium
+        self.font_small = font_small
     
     def _load_default_fonts(self):
         """加载默认字体"""
-        self.font = pygame.font.Font(None, FONT_SIZE_MEDIUM)
-        self.font_large = pygame.font.Font(None, FONT_SIZE_LARGE)
-        self.font_medium = pygame.font.Font(None, FONT_SIZE_MEDIUM)
-        self.font_small = pygame.font.Font(None, FONT_SIZE_SMALL)
+        self._load_fonts(None)
         self.use_chinese = False
         print("使用pygame默认字体")
     
@@ -96,7 +111,7 @@ class Renderer:
             self.background = pygame.image.load(bg_img_path).convert()
         else:
             # 如果背景图像不存在，使用纯色背景
-            self.background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+            self.background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
             self.background.fill(BLACK)
     
     def render(self, game_data):
@@ -118,16 +133,14 @@ class Renderer:
         
         elif current_state == GameState.PLAYING:
             # 绘制游戏进行界面
-            if game_data['all_sprites']:
-                game_data['all_sprites'].draw(self.screen)
+            self.draw_sprites(game_data)
             
             # 绘制游戏UI面板
             self.draw_game_ui(game_data)
         
         elif current_state == GameState.PAUSED:
             # 绘制暂停状态下的游戏画面
-            if game_data['all_sprites']:
-                game_data['all_sprites'].draw(self.screen)
+            self.draw_sprites(game_data)
             
             # 绘制游戏UI面板
             self.draw_game_ui(game_data)
@@ -144,55 +157,151 @@ class Renderer:
             self.draw_instructions_screen(game_data)
         
         # 绘制状态信息（调试用）
-        if current_state:
+        if current_state is not None:
             self.draw_state_info(current_state)
         
-        # 更新屏幕显示
+        # 更新屏幕显示：每帧整屏重绘，始终使用flip()。不要改成收集脏矩形再调用
+        # display.update(rect_list)——精灵数量超过二十多个时，逐个矩形更新的开销
+        # 反而比一次整屏翻转更大
         pygame.display.flip()
     
+    def draw_sprites(self, game_data):
+        """按类型依次绘制敌机、子弹、爆炸效果和玩家飞机，合并为一次批量绘制"""
+        blit_sequence = []
+        for key in ('enemies', 'bullets', 'explosions'):
+            group = game_data.get(key)
+            if group is not None:
+                # FastGroup直接读取稠密列表，省去Group.sprites()复制
+                sprites = getattr(group, 'dense', group)
+                blit_sequence += [(sprite.image, sprite.rect) for sprite in sprites]
+        
+        player = game_data.get('player')
+        if player is not None:
+            blit_sequence.append((player.image, player.rect))
+        
+        blit_batch(self.screen, blit_sequence)
+    
+    def _text(self, font: pygame.font.Font, text: str, color) -> pygame.Surface:
+        """渲染静态文字，相同字体、文本和颜色只渲染一次
+        
+        Args:
+            font: 字体
+            text: 文本
+            color: 文字颜色
+            
+        Returns:
+            渲染好的文字Surface
+        """
+        key = (font, text, color)
+        surface = self._text_cache.get(key)
+        if surface is None:
+            # 抗锯齿文字带逐像素alpha，转换为屏幕的像素格式后blit不再逐次转换
+            surface = font.render(text, True, color).convert_alpha()
+            self._text_cache[key] = surface
+        return surface
+    
+    def _placed_text(self, font: pygame.font.Font, text: str, color, **anchor):
+        """渲染静态文字并按锚点定位，文字和位置都只计算一次
+        
+        Args:
+            font: 字体
+            text: 文本
+            color: 文字颜色
+            anchor: 传给get_rect的定位参数，如 center=(x, y)
+            
+        Returns:
+            (文字Surface, 定位后的Rect)
+        """
+        key = (font, text, color, tuple(anchor.items()))
+        placed = self._placed_cache.get(key)
+        if placed is None:
+            surface = self._text(font, text, color)
+            placed = (surface, surface.get_rect(**anchor))
+            self._placed_cache[key] = placed
+        return placed
+    
+    def _label(self, key: str, font: pygame.font.Font, text: str, color) -> pygame.Surface:
+        """渲染动态文字，文本与上次相同时直接复用上次的结果
+        
+        Args:
+            key: 文字所在位置的标识，如 'score'
+            font: 字体
+            text: 文本
+            color: 文字颜色
+            
+        Returns:
+            渲染好的文字Surface
+        """
+        cached = self._label_cache.get(key)
+        if cached is not None and cached[0] == text:
+            return cached[1]
+        surface = font.render(text, True, color).convert_alpha()
+        self._label_cache[key] = (text, surface)
+        return surface
+    
+    def _build_gradient_background(self) -> pygame.Surface:
+        """生成自上而下由深到浅的蓝色渐变背景
+        
+        Returns:
+            渐变背景Surface
+        """
+        surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        blue = (20 + np.arange(SCREEN_HEIGHT) / SCREEN_HEIGHT * 40).astype(np.uint8)
+        pixels = np.zeros((SCREEN_WIDTH, SCREEN_HEIGHT, 3), np.uint8)
+        pixels[:, :, 2] = blue[None, :]
+        pygame.surfarray.blit_array(surface, pixels)
+        return surface.convert()
+    
+    @staticmethod
+    def _translucent_surface(size) -> pygame.Surface:
+        """生成半透明的黑色Surface
+        
+        Args:
+            size: Surface尺寸
+            
+        Returns:
+            填充为 (0, 0, 0, 128) 的SRCALPHA Surface
+        """
+        surface = pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+        surface.fill((0, 0, 0, 128))
+        return surface
+    
     def draw_start_screen(self, game_data):
         """绘制游戏开始界面"""
-        # 创建渐变背景
-        for y in range(SCREEN_HEIGHT):
-            color_intensity = int(20 + (y / SCREEN_HEIGHT) * 40)
-            color = (0, 0, color_intensity)
-            pygame.draw.line(self.screen, color, (0, y), (SCREEN_WIDTH, y))
+        # 绘制预先生成的渐变背景
+        self.screen.blit(self.start_bg, (0, 0))
         
         # 游戏标题
-        if self.use_chinese:
-            title_text = self.font_large.render("飞机大战", True, WHITE)
-            shadow_text = self.font_large.render("飞机大战", True, (50, 50, 50))
-        else:
-            title_text = self.font_large.render("Plane War", True, WHITE)
-            shadow_text = self.font_large.render("Plane War", True, (50, 50, 50))
-        
-        title_rect = title_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 100))
+        title = "飞机大战" if self.use_chinese else "Plane War"
+        title_text, title_rect = self._placed_text(
+            self.font_large, title, WHITE, center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 100))
         
         # 添加标题阴影效果
-        shadow_rect = shadow_text.get_rect(center=(SCREEN_WIDTH//2 + 3, SCREEN_HEIGHT//2 - 97))
+        shadow_text, shadow_rect = self._placed_text(
+            self.font_large, title, (50, 50, 50), center=(SCREEN_WIDTH//2 + 3, SCREEN_HEIGHT//2 - 97))
         self.screen.blit(shadow_text, shadow_rect)
         self.screen.blit(title_text, title_rect)
         
         if game_data['score'] > 0:
             # 显示最终分数
             if self.use_chinese:
-                score_text = self.font_medium.render(f"最终分数: {game_data['score']}", True, (255, 255, 0))
+                score_text = self._label('final_score', self.font_medium, f"最终分数: {game_data['score']}", (255, 255, 0))
             else:
-                score_text = self.font_medium.render(f"Final Score: {game_data['score']}", True, (255, 255, 0))
+                score_text = self._label('final_score', self.font_medium, f"Final Score: {game_data['score']}", (255, 255, 0))
             score_rect = score_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 30))
             self.screen.blit(score_text, score_rect)
         
         # 操作提示
         if not game_data['show_instructions']:
             if self.use_chinese:
-                start_text = self.font.render("按空格键开始游戏", True, (0, 255, 0))
-                help_text = self.font_small.render("按H键查看操作说明", True, WHITE)
+                start, help_ = "按空格键开始游戏", "按H键查看操作说明"
             else:
-                start_text = self.font.render("Press SPACE to Start", True, (0, 255, 0))
-                help_text = self.font_small.render("Press H for Instructions", True, WHITE)
+                start, help_ = "Press SPACE to Start", "Press H for Instructions"
             
-            start_rect = start_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 30))
-            help_rect = help_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 70))
+            start_text, start_rect = self._placed_text(
+                self.font, start, (0, 255, 0), center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 30))
+            help_text, help_rect = self._placed_text(
+                self.font_small, help_, WHITE, center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 70))
             
             self.screen.blit(start_text, start_rect)
             self.screen.blit(help_text, help_rect)
@@ -224,27 +333,27 @@ class Renderer:
             ]
         
         for i, instruction in enumerate(instructions):
+            center = (SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 20 + i * 25)
             if i == 0:  # 标题
-                text = self.font.render(instruction, True, (255, 255, 0))
+                text, text_rect = self._placed_text(self.font, instruction, (255, 255, 0), center=center)
             elif i == len(instructions) - 1:  # 开始提示
-                text = self.font.render(instruction, True, (0, 255, 0))
+                text, text_rect = self._placed_text(self.font, instruction, (0, 255, 0), center=center)
             else:
-                text = self.font_small.render(instruction, True, WHITE)
+                text, text_rect = self._placed_text(self.font_small, instruction, WHITE, center=center)
             
-            text_rect = text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 20 + i * 25))
             self.screen.blit(text, text_rect)
     
     def draw_game_ui(self, game_data):
         """绘制游戏UI界面"""
         # 绘制分数
         if self.use_chinese:
-            score_text = self.font.render(f"分数: {game_data['score']}", True, WHITE)
-            lives_text = self.font.render(f"生命: {game_data['player_lives']}", True, WHITE)
-            difficulty_text = self.font.render(f"难度: {game_data['difficulty_level']}", True, WHITE)
+            score_text = self._label('score', self.font, f"分数: {game_data['score']}", WHITE)
+            lives_text = self._label('lives', self.font, f"生命: {game_data['player_lives']}", WHITE)
+            difficulty_text = self._label('difficulty', self.font, f"难度: {game_data['difficulty_level']}", WHITE)
         else:
-            score_text = self.font.render(f"Score: {game_data['score']}", True, WHITE)
-            lives_text = self.font.render(f"Lives: {game_data['player_lives']}", True, WHITE)
-            difficulty_text = self.font.render(f"Level: {game_data['difficulty_level']}", True, WHITE)
+            score_text = self._label('score', self.font, f"Score: {game_data['score']}", WHITE)
+            lives_text = self._label('lives', self.font, f"Lives: {game_data['player_lives']}", WHITE)
+            difficulty_text = self._label('difficulty', self.font, f"Level: {game_data['difficulty_level']}", WHITE)
         
         self.screen.blit(score_text, (10, 10))
         
@@ -256,23 +365,20 @@ class Renderer:
     
     def draw_pause_screen(self):
         """绘制暂停画面"""
-        # 创建半透明覆盖层
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.set_alpha(128)
-        overlay.fill(BLACK)
-        self.screen.blit(overlay, (0, 0))
+        # 半透明覆盖层
+        self.screen.blit(self.pause_overlay, (0, 0))
         
         # 暂停文本
         if self.use_chinese:
-            pause_text = self.font_large.render("游戏暂停", True, WHITE)
-            resume_text = self.font.render("按P键继续", True, (0, 255, 0))
+            pause, resume = "游戏暂停", "按P键继续"
         else:
-            pause_text = self.font_large.render("PAUSED", True, WHITE)
-            resume_text = self.font.render("Press P to Continue", True, (0, 255, 0))
+            pause, resume = "PAUSED", "Press P to Continue"
         
         # 居中显示文本
-        pause_rect = pause_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 25))
-        resume_rect = resume_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 25))
+        pause_text, pause_rect = self._placed_text(
+            self.font_large, pause, WHITE, center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 25))
+        resume_text, resume_rect = self._placed_text(
+            self.font, resume, (0, 255, 0), center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 25))
         
         self.screen.blit(pause_text, pause_rect)
         self.screen.blit(resume_text, resume_rect)
@@ -289,37 +395,32 @@ class Renderer:
     
     def draw_instructions_screen(self, game_data):
         """绘制操作说明界面"""
-        # 创建渐变背景
-        for y in range(SCREEN_HEIGHT):
-            color_intensity = int(20 + (y / SCREEN_HEIGHT) * 40)
-            color = (0, 0, color_intensity)
-            pygame.draw.line(self.screen, color, (0, y), (SCREEN_WIDTH, y))
+        # 绘制预先生成的渐变背景
+        self.screen.blit(self.start_bg, (0, 0))
         
         # 显示操作说明
         self._draw_instructions()
         
         # 返回提示
-        if self.use_chinese:
-            back_text = self.font.render("按H键返回", True, (255, 255, 0))
-        else:
-            back_text = self.font.render("Press H to Go Back", True, (255, 255, 0))
-        
-        back_rect = back_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT - 50))
+        back = "按H键返回" if self.use_chinese else "Press H to Go Back"
+        back_text, back_rect = self._placed_text(
+            self.font, back, (255, 255, 0), center=(SCREEN_WIDTH//2, SCREEN_HEIGHT - 50))
         self.screen.blit(back_text, back_rect)
     
     def draw_state_info(self, current_state):
         """绘制状态信息（调试用）"""
         # 在屏幕右上角显示当前状态
         state_name = current_state.name if hasattr(current_state, 'name') else str(current_state)
-        state_text = self.font_small.render(f"State: {state_name}", True, (255, 255, 0))
-        state_rect = state_text.get_rect(topright=(SCREEN_WIDTH - 10, 10))
+        state_text, state_rect = self._placed_text(
+            self.font_small, f"State: {state_name}", (255, 255, 0), topright=(SCREEN_WIDTH - 10, 10))
         
         # 添加半透明背景
         bg_rect = pygame.Rect(state_rect.left - 5, state_rect.top - 2, 
                              state_rect.width + 10, state_rect.height + 4)
-        bg_surface = pygame.Surface((bg_rect.width, bg_rect.height))
-        bg_surface.set_alpha(128)
-        bg_surface.fill((0, 0, 0))
+        bg_surface = self._state_bg_cache.get(bg_rect.size)
+        if bg_surface is None:
+            bg_surface = self._translucent_surface(bg_rect.size)
+            self._state_bg_cache[bg_rect.size] = bg_surface
         self.screen.blit(bg_surface, bg_rect)
         
         self.screen.blit(state_text, state_rect)
\ No newline at end of file
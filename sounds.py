@@ -10,6 +10,9 @@ import numpy as np
 import os
 from config import SOUND_VOLUME, SOUND_FREQUENCY, SOUND_SAMPLE_RATE
 
+# 噪音音效使用的随机数生成器（PCG64，批量采样比旧版全局RandomState更快）
+_RNG = np.random.default_rng()
+
 class SoundManager:
     """音效管理器"""
     
@@ -27,9 +30,6 @@ class SoundManager:
         # 如果音效文件不存在，创建简单的音效
         if not os.path.exists(sounds_dir):
             os.makedirs(sounds_dir, exist_ok=True)
-            
-        # 创建简单的音效
-        self._create_simple_sounds()
         
         # 尝试加载音效文件
         sound_files = {
@@ -53,83 +53,54 @@ class SoundManager:
                 # 文件不存在，使用程序生成的音效
                 self.sounds[sound_name] = self._generate_sound(sound_name)
     
-    def _create_simple_sounds(self):
-        """创建简单的WAV音效文件"""
-        sounds_dir = "resources/sounds"
-        
-        # 射击音效 - 短促的哔声
-        shoot_sound = self._create_beep(frequency=800, duration=0.1)
-        self._save_sound(shoot_sound, os.path.join(sounds_dir, "shoot.wav"))
-        
-        # 爆炸音效 - 噪音效果
-        explosion_sound = self._create_noise(duration=0.3)
-        self._save_sound(explosion_sound, os.path.join(sounds_dir, "explosion.wav"))
-        
-        # 被击中音效 - 低频哔声
-        hit_sound = self._create_beep(frequency=200, duration=0.2)
-        self._save_sound(hit_sound, os.path.join(sounds_dir, "hit.wav"))
-        
-        # 游戏结束音效 - 下降音调
-        game_over_sound = self._create_sweep(start_freq=400, end_freq=100, duration=1.0)
-        self._save_sound(game_over_sound, os.path.join(sounds_dir, "game_over.wav"))
-        
-        # 升级音效 - 上升音调
-        level_up_sound = self._create_sweep(start_freq=200, end_freq=800, duration=0.5)
-        self._save_sound(level_up_sound, os.path.join(sounds_dir, "level_up.wav"))
-    
     def _create_beep(self, frequency=SOUND_FREQUENCY, duration=0.5, sample_rate=SOUND_SAMPLE_RATE):
         """创建哔声音效"""
         frames = int(duration * sample_rate)
-        arr = np.zeros(frames)
+        # 中间缓冲区使用float32，最终转换为int16，精度足够且计算量减半
+        i = np.arange(frames, dtype=np.float32)
         
-        for i in range(frames):
-            # 生成正弦波
-            arr[i] = np.sin(2 * np.pi * frequency * i / sample_rate)
-            # 添加衰减效果
-            arr[i] *= (1 - i / frames) * 0.3
+        # 生成正弦波，整段一次计算；相位数组原地取正弦，不再另分配输出
+        arr = i * np.float32(2 * np.pi * frequency / sample_rate)
+        np.sin(arr, out=arr)
+        # 添加衰减效果
+        arr *= (1 - i / np.float32(frames)) * np.float32(0.3 * 32767)
         
-        return (arr * 32767).astype(np.int16)
+        return arr.astype(np.int16)
     
     def _create_noise(self, duration=0.5, sample_rate=SOUND_SAMPLE_RATE):
         """创建噪音音效"""
         frames = int(duration * sample_rate)
-        # 生成随机噪音
-        arr = np.random.uniform(-1, 1, frames)
+        # 生成[-1, 1)均匀分布的随机噪音（float32）
+        arr = _RNG.random(frames, dtype=np.float32)
+        arr *= 2
+        arr -= 1
         
         # 添加衰减效果
-        for i in range(frames):
-            arr[i] *= (1 - i / frames) * 0.2
+        arr *= (1 - np.arange(frames, dtype=np.float32) / np.float32(frames)) * np.float32(0.2 * 32767)
         
-        return (arr * 32767).astype(np.int16)
+        return arr.astype(np.int16)
     
     def _create_sweep(self, start_freq=200, end_freq=800, duration=0.5, sample_rate=SOUND_SAMPLE_RATE):
-        """创建频率扫描音效"""
-        frames = int(duration * sample_rate)
-        arr = np.zeros(frames)
+        """创建频率扫描音效
         
-        for i in range(frames):
-            # 计算当前频率（线性插值）
-            progress = i / frames
-            current_freq = start_freq + (end_freq - start_freq) * progress
-            
-            # 生成正弦波
-            arr[i] = np.sin(2 * np.pi * current_freq * i / sample_rate)
-            # 添加包络
-            envelope = np.sin(np.pi * progress) * 0.3
-            arr[i] *= envelope
-        
-        return (arr * 32767).astype(np.int16)
-    
-    def _save_sound(self, sound_array, filepath):
-        """保存音效到文件"""
-        try:
-            # 由于pygame.mixer.Sound没有直接的save方法
-            # 我们只是创建Sound对象用于运行时播放
-            # 实际的文件保存功能在这里被跳过
-            pass
-            
-        except Exception as e:
-            print(f"保存音效文件失败: {e}")
+        频率随时间线性变化 f(t) = f0 + (f1 - f0) * t / T，
+        相位取其积分 2π(f0·t + (f1 - f0)·t² / 2T)，扫频连续且终点频率准确
+        """
+        frames = int(duration * sample_rate)
+        i = np.arange(frames, dtype=np.float32)
+        progress = i / np.float32(frames)
+        t = i / np.float32(sample_rate)
+        total = frames / sample_rate
+        
+        # 生成正弦波（float32）
+        phase = t * (np.float32(0.5 * (end_freq - start_freq) / total) * t + np.float32(start_freq))
+        phase *= np.float32(2 * np.pi)
+        arr = np.sin(phase, out=phase)
+        # 添加包络
+        progress *= np.float32(np.pi)
+        arr *= np.sin(progress, out=progress) * np.float32(0.3 * 32767)
+        
+        return arr.astype(np.int16)
     
     def _generate_sound(self, sound_type):
         """根据类型生成音效"""
@@ -4,12 +4,151 @@
 import pygame
 import random
 import os
+from typing import Dict, List, Optional, Tuple
 from config import (
     SCREEN_WIDTH, SCREEN_HEIGHT, WHITE, BLACK, RED, YELLOW, BLUE,
     PLAYER_SPEED, PLAYER_LIVES, PLAYER_INVINCIBLE_TIME, PLAYER_SHOOT_COOLDOWN,
-    ENEMY_BASE_SPEED, ENEMY_TYPES, BULLET_SPEED, BULLET_SIZE, BULLET_COLOR,
+    ENEMY_BASE_SPEED, ENEMY_TYPES, ENEMY_DAMAGE_FLASH_FRAMES, BULLET_SPEED, BULLET_SIZE, BULLET_COLOR,
     IMAGE_FILES
 )
+from entity_pool import get_entity_pool, KIND_BULLET, KIND_ENEMY
+
+# 子弹和敌机的位置同步写入全局实体位置池，供碰撞检测批量读取
+_entity_pool = get_entity_pool()
+
+def load_image(path: str) -> pygame.Surface:
+    """加载带透明通道的图像
+    
+    已设置显示模式时转换为显示格式以加快绘制；未设置时（如无头的基准测试）
+    直接返回原始Surface，避免convert_alpha因缺少显示而报错。
+    
+    Args:
+        path: 图像文件路径
+        
+    Returns:
+        加载后的Surface
+    """
+    image = pygame.image.load(path)
+    if pygame.display.get_surface() is not None:
+        image = image.convert_alpha()
+    return image
+
+# 已加载的精灵图像缓存，同类精灵共享同一个Surface，对象池复用时只需重新赋值引用
+_IMAGES: Dict[str, pygame.Surface] = {}
+_EXPLOSION_FRAMES: Optional[List[pygame.Surface]] = None
+_EXPLOSION_FALLBACK_FRAMES: Optional[List[pygame.Surface]] = None
+
+def get_image(key: str, path: str, size, color) -> pygame.Surface:
+    """获取缓存的精灵图像，首次使用时加载
+    
+    共享的Surface不能直接修改（如set_alpha），需要改动时先copy()。
+    
+    Args:
+        key: 缓存键
+        path: 图像文件路径
+        size: 图像文件不存在时代替用的矩形尺寸
+        color: 图像文件不存在时代替用的矩形颜色
+        
+    Returns:
+        共享的图像Surface
+    """
+    image = _IMAGES.get(key)
+    if image is None:
+        if os.path.exists(path):
+            image = load_image(path)
+        else:
+            # 如果图像不存在，使用矩形代替
+            image = pygame.Surface(size)
+            image.fill(color)
+        _IMAGES[key] = image
+    return image
+
+# 每种敌机类型的配置缓存：(图像, 受伤闪烁图像, 速度修正, 生命值, 分值)
+_ENEMY_CFG: Dict[str, Tuple[pygame.Surface, pygame.Surface, float, int, int]] = {}
+
+def get_enemy_config(enemy_type: str) -> Tuple[pygame.Surface, pygame.Surface, float, int, int]:
+    """获取缓存的敌机类型配置，首次使用时从ENEMY_TYPES读取并加载图像
+    
+    未知类型使用normal的属性，图像仍按该类型的键缓存。
+    
+    Args:
+        enemy_type: 敌机类型
+        
+    Returns:
+        (共享图像, 半透明的受伤闪烁图像, 速度修正, 生命值, 分值)
+    """
+    cfg = _ENEMY_CFG.get(enemy_type)
+    if cfg is None:
+        enemy_config = ENEMY_TYPES.get(enemy_type, ENEMY_TYPES['normal'])
+        if enemy_type == "normal":
+            enemy_img_path = IMAGE_FILES['enemy']
+        else:
+            enemy_img_path = IMAGE_FILES.get(f'enemy_{enemy_type}', IMAGE_FILES['enemy'])
+        # 图像不存在时使用配置中的尺寸和颜色创建矩形
+        image = get_image(f'enemy_{enemy_type}', enemy_img_path,
+                          enemy_config['size'], enemy_config['color'])
+        # 受伤闪烁用的半透明副本只生成一次，同类型敌机共享
+        dim_image = image.copy()
+        dim_image.set_alpha(128)
+        cfg = (image, dim_image, enemy_config['speed_modifier'],
+               enemy_config['health'], enemy_config['score_value'])
+        _ENEMY_CFG[enemy_type] = cfg
+    return cfg
+
+def get_explosion_frames() -> List[pygame.Surface]:
+    """获取缓存的爆炸动画帧序列，首次使用时加载
+    
+    Returns:
+        动画帧列表，没有找到图像时为空列表
+    """
+    global _EXPLOSION_FRAMES
+    if _EXPLOSION_FRAMES is None:
+        frames = []
+        for i in range(8):
+            img_path = os.path.join('resources', 'images', f'explosion{i}.png')
+            if os.path.exists(img_path):
+                frames.append(load_image(img_path))
+        _EXPLOSION_FRAMES = frames
+    return _EXPLOSION_FRAMES
+
+def get_explosion_fallback_frames() -> List[pygame.Surface]:
+    """获取没有爆炸图像时使用的方块动画帧，首次使用时生成
+    
+    Returns:
+        9帧逐渐变大的红色方块，第i帧边长为 5 + 2*i
+    """
+    global _EXPLOSION_FALLBACK_FRAMES
+    if _EXPLOSION_FALLBACK_FRAMES is None:
+        frames = []
+        for i in range(9):
+            size = 5 + i * 2
+            frame = pygame.Surface((size, size))
+            frame.fill(RED)
+            frames.append(frame)
+        _EXPLOSION_FALLBACK_FRAMES = frames
+    return _EXPLOSION_FALLBACK_FRAMES
+
+# 屏幕范围，玩家飞机用它一次完成边界限制
+SCREEN_RECT = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+
+# 批量绘制接口：优先使用fblits（pygame-ce），其次blits，都没有时逐个blit
+_HAS_FBLITS = hasattr(pygame.Surface, 'fblits')
+_HAS_BLITS = hasattr(pygame.Surface, 'blits')
+
+def blit_batch(surface: pygame.Surface, blit_sequence):
+    """一次调用绘制多个(图像, 位置)对
+    
+    Args:
+        surface: 目标Surface
+        blit_sequence: (image, rect) 元组列表
+    """
+    if _HAS_FBLITS:
+        surface.fblits(blit_sequence)
+    elif _HAS_BLITS:
+        surface.blits(blit_sequence, False)
+    else:
+        for image, rect in blit_sequence:
+            surface.blit(image, rect)
 
 class Player(pygame.sprite.Sprite):
     """玩家飞机类"""
@@ -18,14 +157,8 @@ class Player(pygame.sprite.Sprite):
         """初始化玩家飞机"""
         pygame.sprite.Sprite.__init__(self)
         
-        # 加载玩家飞机图像
-        player_img_path = IMAGE_FILES['player']
-        if os.path.exists(player_img_path):
-            self.image = pygame.image.load(player_img_path).convert_alpha()
-        else:
-            # 如果图像不存在，使用矩形代替
-            self.image = pygame.Surface((50, 40))
-            self.image.fill(WHITE)
+        # 加载玩家飞机图像（重新开始游戏时复用已加载的图像）
+        self.image = get_image('player', IMAGE_FILES['player'], (50, 40), WHITE)
         
         self.rect = self.image.get_rect()
         
@@ -46,69 +179,90 @@ class Player(pygame.sprite.Sprite):
         # 射击冷却时间
         self.shoot_cooldown = 0
     
-    def update(self):
-        """更新玩家飞机状态"""
-        # 处理无敌状态
+    def update(self, keystate=None, now=None):
+        """更新玩家飞机状态
+        
+        Args:
+            keystate: 本帧的按键状态快照，为None时自行调用pygame.key.get_pressed()
+            now: 本帧的时间戳（毫秒），为None时自行调用pygame.time.get_ticks()
+        """
+        # 处理无敌状态：无敌期间直接用是否超时给标志赋值；不无敌时（常见情况）不读时间也不写属性
         if self.invincible:
-            current_time = pygame.time.get_ticks()
-            if current_time - self.invincible_time > PLAYER_INVINCIBLE_TIME:
-                self.invincible = False
+            if now is None:
+                now = pygame.time.get_ticks()
+            self.invincible = now - self.invincible_time <= PLAYER_INVINCIBLE_TIME
         
-        # 处理射击冷却
-        if self.shoot_cooldown > 0:
+        # 处理射击冷却（冷却值只会递减到0，不会为负）
+        if self.shoot_cooldown:
             self.shoot_cooldown -= 1
         
         # 获取按键状态
-        keystate = pygame.key.get_pressed()
-        
-        # 左右移动
-        if keystate[pygame.K_LEFT]:
-            self.rect.x -= self.speed
-        if keystate[pygame.K_RIGHT]:
-            self.rect.x += self.speed
+        if keystate is None:
+            keystate = pygame.key.get_pressed()
         
-        # 上下移动
-        if keystate[pygame.K_UP]:
-            self.rect.y -= self.speed
-        if keystate[pygame.K_DOWN]:
-            self.rect.y += self.speed
+        # 方向键的按下状态相减得到-1、0或1，一次移动完成左右和上下
+        dx = keystate[pygame.K_RIGHT] - keystate[pygame.K_LEFT]
+        dy = keystate[pygame.K_DOWN] - keystate[pygame.K_UP]
+        speed = self.speed
+        self.rect.move_ip(dx * speed, dy * speed)
         
         # 限制飞机在屏幕内
-        if self.rect.right > SCREEN_WIDTH:
-            self.rect.right = SCREEN_WIDTH
-        if self.rect.left < 0:
-            self.rect.left = 0
-        if self.rect.top < 0:
-            self.rect.top = 0
-        if self.rect.bottom > SCREEN_HEIGHT:
-            self.rect.bottom = SCREEN_HEIGHT
-    
-    def shoot(self):
-        """发射子弹"""
-        if self.shoot_cooldown <= 0:
-            # 创建子弹
+        self.rect.clamp_ip(SCREEN_RECT)
+    
+    def can_shoot(self) -> bool:
+        """射击冷却是否已结束"""
+        return self.shoot_cooldown <= 0
+    
+    def reset_shoot_cooldown(self):
+        """发射后重新开始射击冷却"""
+        self.shoot_cooldown = PLAYER_SHOOT_COOLDOWN
+    
+    def shoot(self, pool_manager=None):
+        """发射子弹
+        
+        Args:
+            pool_manager: 对象池管理器，提供时从子弹池获取子弹，否则直接创建
+            
+        Returns:
+            子弹对象，冷却中或子弹池已满时返回None
+        """
+        if not self.can_shoot():
+            return None
+        if pool_manager is not None:
+            bullet = pool_manager.get_bullet(self.rect.centerx, self.rect.top)
+        else:
             bullet = Bullet(self.rect.centerx, self.rect.top)
-            self.shoot_cooldown = PLAYER_SHOOT_COOLDOWN  # 设置射击冷却时间
-            return bullet
-        return None
+        if bullet is not None:
+            self.reset_shoot_cooldown()  # 设置射击冷却时间
+        return bullet
     
-    def hit(self):
-        """被击中"""
+    def hit(self, now=None):
+        """被击中
+        
+        Args:
+            now: 本帧的时间戳（毫秒），为None时自行调用pygame.time.get_ticks()
+        """
         if not self.invincible:
             self.lives -= 1
             self.invincible = True
-            self.invincible_time = pygame.time.get_ticks()
+            self.invincible_time = pygame.time.get_ticks() if now is None else now
             return True
         return False
 
 class Enemy(pygame.sprite.Sprite):
-    """敌机基类"""
+    """敌机基类
+    
+    位置和速度保存在实体位置池中，由 GameLogic.move_entities 批量移动和回收。
+    """
     base_speed = ENEMY_BASE_SPEED  # 基础速度，可以被动态调整
     
     def __init__(self, enemy_type="normal"):
         """初始化敌机"""
         pygame.sprite.Sprite.__init__(self)
         
+        # 在实体位置池中分配槽位
+        self.slot_id = _entity_pool.allocate(KIND_ENEMY)
+        
         self.enemy_type = enemy_type
         self.setup_enemy_properties()
         
@@ -116,45 +270,49 @@ class Enemy(pygame.sprite.Sprite):
         self.rect = self.image.get_rect()
         self.rect.x = random.randint(0, SCREEN_WIDTH - self.rect.width)
         self.rect.y = random.randrange(-100, -40)
+        self.sync_slot()
         
         # 设置移动速度
         self.speed_y = self.base_speed_y + random.randrange(0, 2)
         self.speed_x = random.randrange(-1, 2)
     
+    def __del__(self):
+        """释放实体位置池中的槽位"""
+        if _entity_pool is not None:
+            _entity_pool.release(self.slot_id)
+    
+    def sync_slot(self):
+        """把当前矩形写回实体位置池"""
+        _entity_pool.write(self.slot_id, self.rect)
+    
+    @property
+    def speed_x(self) -> float:
+        """水平速度，保存在实体位置池中"""
+        return float(_entity_pool.velocities[self.slot_id, 0])
+    
+    @speed_x.setter
+    def speed_x(self, value):
+        _entity_pool.velocities[self.slot_id, 0] = value
+    
+    @property
+    def speed_y(self) -> float:
+        """垂直速度，保存在实体位置池中（随难度可以带小数）"""
+        return float(_entity_pool.velocities[self.slot_id, 1])
+    
+    @speed_y.setter
+    def speed_y(self, value):
+        _entity_pool.velocities[self.slot_id, 1] = value
+    
     def setup_enemy_properties(self):
         """根据敌机类型设置属性"""
-        enemy_config = ENEMY_TYPES.get(self.enemy_type, ENEMY_TYPES['normal'])
+        # 同类型敌机共享同一个Surface和一份缓存的配置
+        (image, self.dim_image, speed_modifier,
+         self.health, self.score_value) = get_enemy_config(self.enemy_type)
+        self.base_image = self.image = image
         
-        # 加载敌机图像
-        if self.enemy_type == "normal":
-            enemy_img_path = IMAGE_FILES['enemy']
-        else:
-            enemy_img_path = IMAGE_FILES.get(f'enemy_{self.enemy_type}', IMAGE_FILES['enemy'])
-            
-        if os.path.exists(enemy_img_path):
-            self.image = pygame.image.load(enemy_img_path).convert_alpha()
-        else:
-            # 使用配置中的尺寸和颜色创建矩形
-            self.image = pygame.Surface(enemy_config['size'])
-            self.image.fill(enemy_config['color'])
-        
-        # 设置敌机属性
-        self.base_speed_y = Enemy.base_speed + enemy_config['speed_modifier']
-        self.health = enemy_config['health']
-        self.score_value = enemy_config['score_value']
-    
-    def update(self):
-        """更新敌机位置"""
-        self.rect.y += self.speed_y
-        self.rect.x += self.speed_x
-        
-        # 边界检查，防止敌机飞出屏幕两侧
-        if self.rect.left < 0 or self.rect.right > SCREEN_WIDTH:
-            self.speed_x = -self.speed_x
-        
-        # 如果敌机移出屏幕底部，删除它
-        if self.rect.top > SCREEN_HEIGHT:
-            self.kill()
+        # 基础速度随难度调整，每次重新计算
+        self.base_speed_y = Enemy.base_speed + speed_modifier
+        self.damage_flash = 0  # 受伤闪烁剩余帧数
     
     def hit(self):
         """敌机被击中"""
@@ -162,43 +320,69 @@ class Enemy(pygame.sprite.Sprite):
         if self.health <= 0:
             return True  # 敌机被摧毁
         else:
-            # 受伤效果 - 闪烁
-            self.image.set_alpha(128)
+            # 受伤效果 - 闪烁，持续若干帧后由 tick_damage_flash 恢复；
+            # 闪烁期间换成同类型共享的半透明图像，不复制也不修改Surface
+            self.image = self.dim_image
+            self.damage_flash = ENEMY_DAMAGE_FLASH_FRAMES
             return False  # 敌机未被摧毁
+    
+    def tick_damage_flash(self) -> bool:
+        """推进一帧受伤闪烁效果
+        
+        Returns:
+            闪烁效果是否仍在进行
+        """
+        if self.damage_flash <= 0:
+            return False
+        self.damage_flash -= 1
+        if self.damage_flash == 0:
+            self.image = self.base_image
+            return False
+        return True
 
 class Bullet(pygame.sprite.Sprite):
-    """子弹类"""
+    """子弹类
+    
+    位置和速度保存在实体位置池中，由 GameLogic.move_entities 批量移动和回收。
+    """
     
     def __init__(self, x, y):
         """初始化子弹"""
         pygame.sprite.Sprite.__init__(self)
         
-        # 加载子弹图像
-        bullet_img_path = IMAGE_FILES['bullet']
-        if os.path.exists(bullet_img_path):
-            self.image = pygame.image.load(bullet_img_path).convert_alpha()
-        else:
-            # 如果图像不存在，使用矩形代替
-            self.image = pygame.Surface(BULLET_SIZE)
-            self.image.fill(BULLET_COLOR)  # 使用配置中的子弹颜色
+        # 在实体位置池中分配槽位
+        self.slot_id = _entity_pool.allocate(KIND_BULLET)
+        
+        # 获取子弹图像，所有子弹共享同一个Surface；不存在时使用配置中的子弹颜色
+        self.image = get_image('bullet', IMAGE_FILES['bullet'], BULLET_SIZE, BULLET_COLOR)
         
         self.rect = self.image.get_rect()
         
         # 设置子弹位置
         self.rect.centerx = x
         self.rect.bottom = y
+        self.sync_slot()
         
         # 设置子弹速度
         self.speed = -BULLET_SPEED  # 负值表示向上移动
     
-    def update(self):
-        """更新子弹状态"""
-        # 移动子弹
-        self.rect.y += self.speed
-        
-        # 如果子弹飞出屏幕顶部，删除子弹
-        if self.rect.bottom < 0:
-            self.kill()
+    def __del__(self):
+        """释放实体位置池中的槽位"""
+        if _entity_pool is not None:
+            _entity_pool.release(self.slot_id)
+    
+    def sync_slot(self):
+        """把当前矩形写回实体位置池"""
+        _entity_pool.write(self.slot_id, self.rect)
+    
+    @property
+    def speed(self) -> float:
+        """垂直速度，保存在实体位置池中"""
+        return float(_entity_pool.velocities[self.slot_id, 1])
+    
+    @speed.setter
+    def speed(self, value):
+        _entity_pool.velocities[self.slot_id, 1] = value
 
 class Explosion(pygame.sprite.Sprite):
     """爆炸效果类"""
@@ -207,37 +391,51 @@ class Explosion(pygame.sprite.Sprite):
         """初始化爆炸效果"""
         pygame.sprite.Sprite.__init__(self)
         
-        # 加载爆炸效果图像序列
-        self.explosion_anim = []
-        for i in range(8):
-            img_path = os.path.join('resources', 'images', f'explosion{i}.png')
-            if os.path.exists(img_path):
-                img = pygame.image.load(img_path).convert_alpha()
-                self.explosion_anim.append(img)
-        
-        # 如果没有找到图像，使用简单的圆形代替
-        if not self.explosion_anim:
-            self.size = 5
-            self.image = pygame.Surface((self.size, self.size))
-            self.image.fill(RED)
-            self.use_animation = False
-        else:
-            self.image = self.explosion_anim[0]
-            self.use_animation = True
+        # 爆炸效果图像序列，所有爆炸效果共享
+        self.explosion_anim = get_explosion_frames()
+        
+        # 如果没有找到图像，使用预先生成的方块动画代替
+        self.use_animation = bool(self.explosion_anim)
+        if not self.use_animation:
+            self.explosion_anim = get_explosion_fallback_frames()
+        
+        # 所属的爆炸效果池，由ExplosionPool设置
+        self.pool = None
         
+        # 设置帧计数器
+        self.frame_rate = 2  # 动画速度
+        self.reset(center)
+    
+    def reset(self, center):
+        """重置爆炸效果，从第一帧重新播放
+        
+        Args:
+            center: 爆炸中心位置
+        """
+        self.image = self.explosion_anim[0]
         self.rect = self.image.get_rect()
         self.rect.center = center
         
-        # 设置帧计数器
         self.frame = 0
-        self.frame_rate = 2  # 动画速度
         self.last_update = pygame.time.get_ticks()
     
-    def update(self):
-        """更新爆炸效果"""
+    def finish(self):
+        """爆炸效果结束：归还到爆炸效果池，不在池中时直接删除精灵"""
+        if self.pool is not None:
+            self.pool.return_object(self)
+        else:
+            self.kill()
+    
+    def update(self, now=None):
+        """更新爆炸效果
+        
+        Args:
+            now: 本帧的时间戳（毫秒），为None时自行调用pygame.time.get_ticks()
+        """
         if self.use_animation:
             # 基于时间的动画更新
-            now = pygame.time.get_ticks()
+            if now is None:
+                now = pygame.time.get_ticks()
             if now - self.last_update > 50:  # 每50毫秒更新一帧
                 self.last_update = now
                 self.frame += 1
@@ -247,16 +445,14 @@ class Explosion(pygame.sprite.Sprite):
                     self.rect = self.image.get_rect()
                     self.rect.center = center
                 else:
-                    self.kill()  # 爆炸效果结束，删除精灵
+                    self.finish()  # 爆炸效果结束
         else:
-            # 使用简单的圆形动画
+            # 使用简单的方块动画，逐帧换成预先生成的更大方块
             self.frame += 1
-            if self.frame <= 8:
-                self.size = 5 + self.frame * 2
+            if self.frame < len(self.explosion_anim):
                 center = self.rect.center
-                self.image = pygame.Surface((self.size, self.size))
-                self.image.fill(RED)
-                self.rect = self.image.get_rect()
+                self.image = self.explosion_anim[self.frame]
+                self.rect.size = self.image.get_size()
                 self.rect.center = center
             else:
-                self.kill()  # 爆炸效果结束，删除精灵
\ No newline at end of file
+                self.finish()  # 爆炸效果结束
\ No newline at end of file
@@ -1,17 +1,31 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from enum import Enum
-from typing import Dict, Callable, Optional
+from enum import IntEnum
+from typing import Dict, Callable, FrozenSet, Optional
 
-class GameState(Enum):
-    """游戏状态枚举"""
-    INIT = "init"           # 游戏初始化状态
-    MENU = "menu"           # 主菜单状态
-    PLAYING = "playing"     # 游戏进行中状态
-    PAUSED = "paused"       # 游戏暂停状态
-    GAME_OVER = "game_over" # 游戏结束状态
-    INSTRUCTIONS = "instructions"  # 操作说明状态
+class GameState(IntEnum):
+    """游戏状态枚举
+    
+    使用整数值，状态之间的比较和哈希直接走int的实现；
+    日志中显示的状态名见_NAME。
+    """
+    INIT = 0          # 游戏初始化状态
+    MENU = 1          # 主菜单状态
+    PLAYING = 2       # 游戏进行中状态
+    PAUSED = 3        # 游戏暂停状态
+    GAME_OVER = 4     # 游戏结束状态
+    INSTRUCTIONS = 5  # 操作说明状态
+
+# 状态的显示名称（与原先字符串枚举的值一致）
+_NAME: Dict[GameState, str] = {
+    GameState.INIT: "init",
+    GameState.MENU: "menu",
+    GameState.PLAYING: "playing",
+    GameState.PAUSED: "paused",
+    GameState.GAME_OVER: "game_over",
+    GameState.INSTRUCTIONS: "instructions"
+}
 
 class StateManager:
     """游戏状态管理器
@@ -20,6 +34,16 @@ class StateManager:
     状态验证和状态回调等功能。
     """
     
+    # 允许的状态转换，所有实例共享；目标状态用frozenset存放，成员判断为O(1)
+    _allowed_transitions: Dict[GameState, FrozenSet[GameState]] = {
+        GameState.INIT: frozenset({GameState.MENU, GameState.PLAYING}),
+        GameState.MENU: frozenset({GameState.PLAYING, GameState.INSTRUCTIONS}),
+        GameState.PLAYING: frozenset({GameState.PAUSED, GameState.GAME_OVER, GameState.MENU}),
+        GameState.PAUSED: frozenset({GameState.PLAYING, GameState.MENU, GameState.GAME_OVER}),
+        GameState.GAME_OVER: frozenset({GameState.MENU, GameState.PLAYING, GameState.INSTRUCTIONS}),
+        GameState.INSTRUCTIONS: frozenset({GameState.MENU, GameState.GAME_OVER})
+    }
+    
     def __init__(self, initial_state: GameState = GameState.INIT):
         """初始化状态管理器
         
@@ -32,16 +56,6 @@ class StateManager:
         # 状态切换回调函数字典
         self._state_enter_callbacks: Dict[GameState, Callable] = {}
         self._state_exit_callbacks: Dict[GameState, Callable] = {}
-        
-        # 定义允许的状态转换
-        self._allowed_transitions = {
-            GameState.INIT: [GameState.MENU, GameState.PLAYING],
-            GameState.MENU: [GameState.PLAYING, GameState.INSTRUCTIONS],
-            GameState.PLAYING: [GameState.PAUSED, GameState.GAME_OVER, GameState.MENU],
-            GameState.PAUSED: [GameState.PLAYING, GameState.MENU, GameState.GAME_OVER],
-            GameState.GAME_OVER: [GameState.MENU, GameState.PLAYING, GameState.INSTRUCTIONS],
-            GameState.INSTRUCTIONS: [GameState.MENU, GameState.GAME_OVER]
-        }
     
     @property
     def current_state(self) -> GameState:
@@ -66,7 +80,7 @@ class StateManager:
         Returns:
             bool: 如果可以转换返回True，否则返回False
         """
-        allowed_states = self._allowed_transitions.get(self._current_state, [])
+        allowed_states = self._allowed_transitions.get(self._current_state, frozenset())
         return new_state in allowed_states
     
     def transition_to(self, new_state: GameState, force: bool = False) -> bool:
@@ -85,7 +99,7 @@ class StateManager:
         
         # 检查转换是否被允许
         if not force and not self.can_transition_to(new_state):
-            print(f"警告: 不允许从 {self._current_state.value} 转换到 {new_state.value}")
+            print(f"警告: 不允许从 {_NAME[self._current_state]} 转换到 {_NAME[new_state]}")
             return False
         
         # 执行状态退出回调
@@ -108,7 +122,7 @@ class StateManager:
             except Exception as e:
                 print(f"状态进入回调执行失败: {e}")
         
-        print(f"状态转换: {self._previous_state.value} -> {self._current_state.value}")
+        print(f"状态转换: {_NAME[self._previous_state]} -> {_NAME[self._current_state]}")
         return True
     
     def register_enter_callback(self, state: GameState, callback: Callable):
@@ -129,6 +143,17 @@ class StateManager:
         """
         self._state_exit_callbacks[state] = callback
     
+    def register_callbacks(self, enter_map: Dict[GameState, Callable],
+                           exit_map: Dict[GameState, Callable]):
+        """一次性注册多个状态的进入/退出回调函数
+        
+        Args:
+            enter_map: 状态到进入回调函数的映射
+            exit_map: 状态到退出回调函数的映射
+        """
+        self._state_enter_callbacks.update(enter_map)
+        self._state_exit_callbacks.update(exit_map)
+    
     def is_state(self, state: GameState) -> bool:
         """检查当前是否为指定状态
         
@@ -203,6 +228,6 @@ class StateManager:
             Dict[str, str]: 包含当前状态和前一个状态的字典
         """
         return {
-            "current": self._current_state.value,
-            "previous": self._previous_state.value if self._previous_state else None
+            "current": _NAME[self._current_state],
+            "previous": _NAME[self._previous_state] if self._previous_state is not None else None
         }
\ No newline at end of file